@@ -0,0 +1,11 @@
+"""
+Compatibility helpers for the supported Python versions.
+"""
+
+import sys
+from typing import Dict
+
+# Keyword arguments for @dataclass that drop the per-instance __dict__ on
+# Python 3.10+, where dataclasses support slots; empty on older versions.
+# Use it for models created once per resource: @dataclass(**DATACLASS_SLOTS)
+DATACLASS_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -6,10 +6,14 @@ for cleaner architecture diagrams.
 """
 
 import re
+import sys
+from collections import defaultdict
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
 
+from ._compat import DATACLASS_SLOTS
 from .config_loader import ConfigLoader
 from .parser import ParseResult, TerraformResource
 
@@ -18,10 +22,24 @@ if TYPE_CHECKING:
     from .variable_resolver import VariableResolver
 
 
+# Trailing AZ suffix of a standard AWS AZ name, e.g. "1a" in "us-east-1a"
+_RE_AZ_SHORT_NAME = re.compile(r"(\d[a-z])$")
+
+# AZ suffix at the end of a subnet resource name: -1a/_2a, -1/_3 or -a/_c.
+# The alternatives cannot match the same name, so one search replaces
+# trying them in turn; the matching alternative's group holds the suffix.
+_RE_AZ_SUFFIX = re.compile(r"[-_](?:(\d[a-f])|(\d+)|([a-f]))$")
+
+# Terraform resource reference: aws_type.name (optionally inside ${...})
+_RE_RESOURCE_REF = re.compile(r"(aws_\w+\.\w+)")
+
+
 # VPC Structure Data Models (Task 5)
+# build() renames subnets and sets their route table after construction,
+# so these models are slotted but not frozen.
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Subnet:
     """Represents a subnet within a VPC."""
 
@@ -34,7 +52,7 @@ class Subnet:
     route_table_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AvailabilityZone:
     """Represents an availability zone containing subnets."""
 
@@ -43,7 +61,7 @@ class AvailabilityZone:
     subnets: List[Subnet] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class VPCEndpoint:
     """Represents a VPC endpoint."""
 
@@ -53,7 +71,7 @@ class VPCEndpoint:
     service: str  # e.g., 's3', 'dynamodb', 'ecr.api'
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class VPCStructure:
     """Represents the complete VPC structure with AZs and endpoints."""
 
@@ -105,6 +123,8 @@ class AggregatedResult:
     vpc_services: List[LogicalService] = field(default_factory=list)
     global_services: List[LogicalService] = field(default_factory=list)
     vpc_structure: Optional[VPCStructure] = None
+    # Resources across all services, counted by ResourceAggregator.aggregate()
+    total_resources: int = 0
 
 
 class ResourceAggregator:
@@ -115,6 +135,8 @@ class ResourceAggregator:
         self._aggregation_rules = self._build_aggregation_rules()
         self._logical_connections = self._config.get_logical_connections()
         self._build_type_to_rule_map()
+        # Stateless between build() calls, so one builder serves every aggregate()
+        self._vpc_builder = VPCStructureBuilder()
 
     def _build_aggregation_rules(self) -> Dict[str, Dict[str, Any]]:
         """Build aggregation rules dict from config."""
@@ -258,16 +280,15 @@ class ResourceAggregator:
 
         # If attribute name contains unresolved variables, use resource_name
         if isinstance(attr_name, str) and attr_name:
-            # Resolve any variable interpolations
-            if resolver:
+            if "${" not in attr_name:
+                # Literal name, nothing to resolve
+                display_name = attr_name
+            elif resolver:
+                # Resolve any variable interpolations
                 resolved_name = resolver.resolve(attr_name)
                 # If still contains ${, fall back to resource name
                 if "${" not in resolved_name:
                     display_name = resolved_name
-            else:
-                # If it doesn't contain ${, use attr_name
-                if "${" not in attr_name:
-                    display_name = attr_name
 
         # Clean up underscore-based names to be more readable
         display_name = display_name.replace("_", " ").title()
@@ -339,6 +360,7 @@ class ResourceAggregator:
                 )
 
                 result.services.append(service)
+                result.total_resources += len(service.resources)
                 if rule["is_vpc"]:
                     result.vpc_services.append(service)
                 else:
@@ -405,8 +427,7 @@ class ResourceAggregator:
 
         # Build VPC structure if resolver is available
         if resolver is not None:
-            vpc_builder = VPCStructureBuilder()
-            result.vpc_structure = vpc_builder.build(
+            result.vpc_structure = self._vpc_builder.build(
                 parse_result.resources,
                 resolver=resolver,
                 state_result=state_result,
@@ -468,14 +489,17 @@ class ResourceAggregator:
                 if svc_id:
                     sg_to_services.setdefault(rel.target_id, []).append(svc_id)
 
-        # For each sg_allows_from relationship, create connections between services
-        seen: Set[Tuple[str, str]] = set()
+        # For each sg_allows_from relationship, collect service pairs to connect.
+        # Keyed by (source, target) so duplicates cost a single setdefault; dict
+        # order keeps the first-seen pair (and its label) in discovery order.
+        edges: Dict[Tuple[str, str], str] = {}
         for rel in parse_result.relationships:
             if rel.relationship_type != "sg_allows_from":
                 continue
 
             source_sg = rel.source_id  # SG that is allowed FROM
             target_sg = rel.target_id  # SG that allows traffic
+            label = rel.label or ""
 
             source_services = sg_to_services.get(source_sg, [])
             target_services = sg_to_services.get(target_sg, [])
@@ -484,38 +508,24 @@ class ResourceAggregator:
             for src_svc_id in source_services:
                 for tgt_svc_id in target_services:
                     # Skip self-referencing (same service)
-                    if src_svc_id == tgt_svc_id:
-                        continue
-                    # Deduplicate
-                    key = (src_svc_id, tgt_svc_id)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-
-                    result.connections.append(
-                        LogicalConnection(
-                            source_id=src_svc_id,
-                            target_id=tgt_svc_id,
-                            label=rel.label or "",
-                            connection_type="security_rule",
-                        )
-                    )
+                    if src_svc_id != tgt_svc_id:
+                        edges.setdefault((src_svc_id, tgt_svc_id), label)
 
             # Also connect the SG nodes directly (if they are services)
             source_sg_svc = resource_to_service.get(source_sg)
             target_sg_svc = resource_to_service.get(target_sg)
             if source_sg_svc and target_sg_svc and source_sg_svc != target_sg_svc:
-                key = (source_sg_svc, target_sg_svc)
-                if key not in seen:
-                    seen.add(key)
-                    result.connections.append(
-                        LogicalConnection(
-                            source_id=source_sg_svc,
-                            target_id=target_sg_svc,
-                            label=rel.label or "",
-                            connection_type="security_rule",
-                        )
-                    )
+                edges.setdefault((source_sg_svc, target_sg_svc), label)
+
+        result.connections.extend(
+            LogicalConnection(
+                source_id=src_svc_id,
+                target_id=tgt_svc_id,
+                label=label,
+                connection_type="security_rule",
+            )
+            for (src_svc_id, tgt_svc_id), label in edges.items()
+        )
 
     @staticmethod
     def get_aggregation_metadata(
@@ -552,19 +562,37 @@ class ResourceAggregator:
         return type_info
 
 
+class _SubnetTypeTable:
+    """SUBNET_TYPE_PATTERNS flattened for subnet type detection.
+
+    Hashed by identity, so using one as a cache key costs a pointer hash.
+    """
+
+    __slots__ = ("patterns", "tag_types")
+
+    def __init__(self, type_patterns: Dict[str, List[str]]) -> None:
+        # (pattern, subnet_type) pairs in priority order, for single-loop name matching
+        self.patterns: Tuple[Tuple[str, str], ...] = tuple(
+            (pattern, subnet_type)
+            for subnet_type, patterns in type_patterns.items()
+            for pattern in patterns
+        )
+        # Exact Type tag value -> subnet type; the first type listing a value wins
+        self.tag_types: Dict[str, str] = dict(reversed(self.patterns))
+
+
 class VPCStructureBuilder:
     """Builds VPC structure from Terraform resources."""
 
-    # Regex patterns for detecting AZ from resource names
-    AZ_PATTERNS: List[tuple] = [
-        # Pattern: name-a, name-b, name-c (single letter suffix)
-        (r"[-_]([a-f])$", lambda m: m.group(1)),
-        # Pattern: name-1a, name-1b, name-2a (number + letter suffix)
-        (r"[-_](\d[a-f])$", lambda m: m.group(1)),
-        # Pattern: name-az1, name-az2, name-az3 (az + number suffix)
-        (r"[-_]az(\d)$", lambda m: m.group(1)),
-        # Pattern: zone-a, zone-b in the middle of name
-        (r"[-_]([a-f])[-_]", lambda m: m.group(1)),
+    # Regex patterns for detecting AZ from resource names, tried in order;
+    # the last matched group of a match is the AZ suffix
+    AZ_PATTERNS: List["re.Pattern[str]"] = [
+        # Suffix patterns, fused into one search since only one can match:
+        # name-a (single letter), name-1a (number + letter), name-az1 (az + number)
+        re.compile(r"[-_](?:([a-f])|(\d[a-f])|az(\d))$"),
+        # Pattern: zone-a, zone-b in the middle of name. Kept separate: fused
+        # in, it could win over a suffix further right in the name
+        re.compile(r"[-_]([a-f])[-_]"),
     ]
 
     # Patterns for detecting subnet type from name/tags
@@ -584,6 +612,13 @@ class VPCStructureBuilder:
         "database": ["database", "db", "rds", "data", "storage", "persistence"],
     }
 
+    def __init__(self) -> None:
+        # Detection tables derived once from this builder's AZ_PATTERNS and
+        # SUBNET_TYPE_PATTERNS, so subclass overrides apply; later edits need a
+        # new builder
+        self._az_patterns: Tuple["re.Pattern[str]", ...] = tuple(self.AZ_PATTERNS)
+        self._subnet_table = _SubnetTypeTable(self.SUBNET_TYPE_PATTERNS)
+
     def _detect_availability_zone(
         self, resource: TerraformResource, sequential_index: Optional[int] = None
     ) -> Optional[str]:
@@ -609,14 +644,10 @@ class VPCStructureBuilder:
         if not isinstance(name, str):
             name = resource.resource_name
 
-        name_lower = name.lower()
-
-        for pattern, extractor in self.AZ_PATTERNS:
-            match = re.search(pattern, name_lower)
-            if match:
-                suffix = extractor(match)
-                # Return a placeholder AZ name with the detected suffix
-                return f"detected-{suffix}"
+        suffix = self._az_suffix_from_name(self._az_patterns, name)
+        if suffix is not None:
+            # Return a placeholder AZ name with the detected suffix
+            return f"detected-{suffix}"
 
         # If we have a sequential index (for count-based resources), use it
         if sequential_index is not None:
@@ -626,6 +657,22 @@ class VPCStructureBuilder:
 
         return None
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _az_suffix_from_name(patterns: Tuple["re.Pattern[str]", ...], name: str) -> Optional[str]:
+        """Return the AZ suffix the first matching pattern finds in a name, ignoring case.
+
+        Names repeat heavily across resources (prod-public-a, prod-private-a,
+        ...), so results are cached, keyed on the patterns as well as the name.
+        Lowercasing happens inside, so cache hits skip it.
+        """
+        name_lower = name.lower()
+        for pattern in patterns:
+            match = pattern.search(name_lower)
+            if match:
+                return match.group(match.lastindex or 0)
+        return None
+
     def _detect_subnet_type(self, resource: TerraformResource) -> str:
         """Detect subnet type from name or tags.
 
@@ -635,31 +682,42 @@ class VPCStructureBuilder:
         Returns:
             Detected subnet type ('public', 'private', 'database', or 'unknown')
         """
-        # Check resource name and name attribute
-        names_to_check = [
-            resource.resource_name,
-            resource.attributes.get("name", ""),
-        ]
-
         # Check tags
+        type_tag = ""
         tags = resource.attributes.get("tags", {})
         if isinstance(tags, dict):
-            type_tag = tags.get("Type", tags.get("type", ""))
-            if type_tag:
-                type_tag_lower = type_tag.lower()
-                for subnet_type, patterns in self.SUBNET_TYPE_PATTERNS.items():
-                    if type_tag_lower in patterns:
-                        return subnet_type
+            tag_value = tags.get("Type", tags.get("type", ""))
+            if isinstance(tag_value, str):
+                type_tag = tag_value
+
+        # Check resource name and name attribute
+        name = resource.attributes.get("name", "")
+        if isinstance(name, str):
+            names_to_check: Tuple[str, ...] = (resource.resource_name, name)
+        else:
+            names_to_check = (resource.resource_name,)
+
+        return self._subnet_type_from(self._subnet_table, type_tag, names_to_check)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _subnet_type_from(table: _SubnetTypeTable, type_tag: str, names: Tuple[str, ...]) -> str:
+        """Classify a subnet from its Type tag and names.
+
+        Subnets share few distinct tag/name combinations, so results are cached,
+        keyed on the builder's pattern table as well as the tag and names.
+        """
+        if type_tag:
+            subnet_type = table.tag_types.get(type_tag.lower())
+            if subnet_type is not None:
+                return subnet_type
 
         # Check name patterns
-        for name in names_to_check:
-            if not isinstance(name, str):
-                continue
+        for name in names:
             name_lower = name.lower()
-            for subnet_type, patterns in self.SUBNET_TYPE_PATTERNS.items():
-                for pattern in patterns:
-                    if pattern in name_lower:
-                        return subnet_type
+            for pattern, subnet_type in table.patterns:
+                if pattern in name_lower:
+                    return subnet_type
 
         return "unknown"
 
@@ -672,11 +730,11 @@ class VPCStructureBuilder:
         Returns:
             Endpoint type ('gateway' or 'interface')
         """
+        # Gateway endpoints are the special case; Interface, GatewayLoadBalancer
+        # and Resource endpoints all attach through ENIs and render as interface
         endpoint_type = resource.attributes.get("vpc_endpoint_type", "")
-        if isinstance(endpoint_type, str):
-            endpoint_type_lower = endpoint_type.lower()
-            if endpoint_type_lower == "gateway":
-                return "gateway"
+        if isinstance(endpoint_type, str) and endpoint_type.lower() == "gateway":
+            return "gateway"
         return "interface"
 
     def _detect_endpoint_service(self, resource: TerraformResource) -> str:
@@ -691,7 +749,12 @@ class VPCStructureBuilder:
         service_name = resource.attributes.get("service_name", "")
         if not isinstance(service_name, str):
             return "unknown"
+        return self._service_from_name(service_name)
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _service_from_name(service_name: str) -> str:
+        """Extract the service from an endpoint service_name (cached)."""
         # Service name format: com.amazonaws.<region>.<service>
         # Example: com.amazonaws.us-east-1.s3
         # But if region is a variable like ${var.aws_region}, we get:
@@ -700,26 +763,19 @@ class VPCStructureBuilder:
         # Strategy: take the last part(s) after the last known prefix
         # If there's a variable pattern, extract service from the end
         if "${" in service_name:
-            # Find the service after the variable - typically the last segment
+            # The service is everything after the last dot-separated segment
+            # holding part of an interpolation ("${" or "}")
             # e.g., "com.amazonaws.${var.aws_region}.s3" -> "s3"
-            parts = service_name.split(".")
-            # Get parts after any that contain "${"
-            service_parts = []
-            found_var = False
-            for part in parts:
-                if "${" in part or "}" in part:
-                    found_var = True
-                    service_parts = []  # Reset, service comes after
-                elif found_var:
-                    service_parts.append(part)
-            if service_parts:
-                return ".".join(service_parts)
+            last_var = max(service_name.rfind("${"), service_name.rfind("}"))
+            segment_end = service_name.find(".", last_var)
+            if segment_end != -1:
+                return service_name[segment_end + 1 :]
 
         # Standard parsing: com.amazonaws.<region>.<service>
-        parts = service_name.split(".")
-        if len(parts) >= 4:
-            # Join everything after the region (handles services like ecr.api)
-            return ".".join(parts[3:])
+        # maxsplit keeps everything after the region together (e.g. ecr.api)
+        parts = service_name.split(".", 3)
+        if len(parts) == 4:
+            return parts[3]
 
         return "unknown"
 
@@ -737,7 +793,7 @@ class VPCStructureBuilder:
             return az_name.replace("detected-", "")
 
         # Handle standard AWS AZ names like us-east-1a
-        match = re.search(r"(\d[a-z])$", az_name)
+        match = _RE_AZ_SHORT_NAME.search(az_name)
         if match:
             return match.group(1)
 
@@ -768,43 +824,34 @@ class VPCStructureBuilder:
         """
         name_lower = resource_name.lower()
 
-        # Pattern priority: more specific patterns first
-        patterns = [
-            r"[-_](\d[a-f])$",  # ends with -1a, -1b, _2a
-            r"[-_](\d+)$",  # ends with -1, -2, _3
-            r"[-_]([a-f])$",  # ends with -a, -b, _c
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, name_lower)
-            if match:
-                return match.group(1)
+        match = _RE_AZ_SUFFIX.search(name_lower)
+        if match:
+            return match.group(match.lastindex or 0)
 
         return None
 
     def _resolve_route_table_names(
         self,
-        resources: List[TerraformResource],
+        route_tables: List[TerraformResource],
+        associations: List[TerraformResource],
         availability_zones: List[AvailabilityZone],
     ) -> None:
         """Resolve route table names for subnets via route table associations."""
         # Build route table name lookup: resource_id -> name
         rt_names: Dict[str, str] = {}
-        for r in resources:
-            if r.resource_type == "aws_route_table":
-                name = r.attributes.get("name", r.resource_name)
-                rt_names[r.full_id] = name
+        for r in route_tables:
+            name = r.attributes.get("name", r.resource_name)
+            rt_names[r.full_id] = name
 
         # Build subnet -> route table mapping from associations
         subnet_to_rt: Dict[str, str] = {}
-        for r in resources:
-            if r.resource_type == "aws_route_table_association":
-                attrs = r.attributes
-                # Find subnet reference
-                subnet_ref = self._extract_ref(attrs.get("subnet_id", ""))
-                rt_ref = self._extract_ref(attrs.get("route_table_id", ""))
-                if subnet_ref and rt_ref and rt_ref in rt_names:
-                    subnet_to_rt[subnet_ref] = rt_names[rt_ref]
+        for r in associations:
+            attrs = r.attributes
+            # Find subnet reference
+            subnet_ref = self._extract_ref(attrs.get("subnet_id", ""))
+            rt_ref = self._extract_ref(attrs.get("route_table_id", ""))
+            if subnet_ref and rt_ref and rt_ref in rt_names:
+                subnet_to_rt[subnet_ref] = rt_names[rt_ref]
 
         # Apply to subnet objects
         for az in availability_zones:
@@ -818,13 +865,19 @@ class VPCStructureBuilder:
         if not isinstance(value, str):
             return None
         # Match pattern: aws_type.name.id or ${aws_type.name.id}
-        import re
-
-        match = re.search(r"(aws_\w+\.\w+)", value)
+        match = _RE_RESOURCE_REF.search(value)
         if match:
             return match.group(1)
         return None
 
+    @staticmethod
+    def _resolve_name(resource: TerraformResource, resolver: Optional["VariableResolver"]) -> Any:
+        """Return a resource's name attribute (or resource name), resolved if needed."""
+        name = resource.attributes.get("name", resource.resource_name)
+        if resolver and isinstance(name, str) and "${" in name:
+            name = resolver.resolve(name)
+        return name
+
     def build(
         self,
         resources: List[TerraformResource],
@@ -844,6 +897,24 @@ class VPCStructureBuilder:
         if not resources:
             return None
 
+        # Bucket the resources the VPC structure needs in a single pass
+        buckets: Dict[str, List[TerraformResource]] = {
+            "aws_vpc": [],
+            "aws_subnet": [],
+            "aws_vpc_endpoint": [],
+            "aws_route_table": [],
+            "aws_route_table_association": [],
+        }
+        for r in resources:
+            bucket = buckets.get(r.resource_type)
+            if bucket is not None:
+                bucket.append(r)
+
+        # Use the first VPC resource
+        if not buckets["aws_vpc"]:
+            return None
+        vpc_resource = buckets["aws_vpc"][0]
+
         # Build state lookup index if state is available
         state_index: Dict[str, Dict[str, Any]] = {}
         if state_result:
@@ -853,34 +924,18 @@ class VPCStructureBuilder:
                 resource_id = map_state_to_resource_id(state_res.address)
                 state_index[resource_id] = state_res.values
 
-        # Find VPC resource
-        vpc_resource = None
-        for r in resources:
-            if r.resource_type == "aws_vpc":
-                vpc_resource = r
-                break
-
-        if not vpc_resource:
-            return None
-
         # Get VPC name
-        vpc_name = vpc_resource.attributes.get("name", vpc_resource.resource_name)
-        if resolver and isinstance(vpc_name, str):
-            vpc_name = resolver.resolve(vpc_name)
+        vpc_name = self._resolve_name(vpc_resource, resolver)
 
         # Collect subnets and group by AZ for realistic representation
         # In AWS, each AZ contains all subnet types (public, private, database)
-        subnet_resources = [r for r in resources if r.resource_type == "aws_subnet"]
-
         # First pass: collect all subnets with their AZ info
         all_subnets: List[Tuple[TerraformResource, Subnet, Optional[str]]] = []
         explicit_azs: Set[str] = set()
 
-        for r in subnet_resources:
+        for r in buckets["aws_subnet"]:
             # Get subnet name
-            subnet_name = r.attributes.get("name", r.resource_name)
-            if resolver and isinstance(subnet_name, str):
-                subnet_name = resolver.resolve(subnet_name)
+            subnet_name = self._resolve_name(r, resolver)
 
             subnet_type = self._detect_subnet_type(r)
 
@@ -898,12 +953,14 @@ class VPCStructureBuilder:
             # Try to extract suffix from resource name (e.g., "-a", "-1")
             suffix = self._extract_az_suffix(r.resource_name)
 
-            # Determine AZ key for grouping
+            # Determine AZ key for grouping. Keys repeat across subnets and are
+            # built at runtime (state JSON, f-strings), so intern them to share
+            # one string per AZ across all Subnet objects and dict lookups
             if explicit_az and not explicit_az.startswith("detected-"):
-                az_key = explicit_az
-                explicit_azs.add(explicit_az)
+                az_key = sys.intern(explicit_az)
+                explicit_azs.add(az_key)
             elif suffix:
-                az_key = f"detected-{suffix}"
+                az_key = sys.intern(f"detected-{suffix}")
             else:
                 az_key = None  # Will be assigned later
 
@@ -945,9 +1002,9 @@ class VPCStructureBuilder:
                     num_azs = len(detected_azs)
                 else:
                     # Count subnets by type and use max
-                    type_counts: Dict[str, int] = {}
+                    type_counts: Dict[str, int] = defaultdict(int)
                     for _, subnet, _ in all_subnets:
-                        type_counts[subnet.subnet_type] = type_counts.get(subnet.subnet_type, 0) + 1
+                        type_counts[subnet.subnet_type] += 1
                     if type_counts:
                         num_azs = max(type_counts.values())
 
@@ -955,20 +1012,22 @@ class VPCStructureBuilder:
             az_names = [f"detected-{az_letters[i % len(az_letters)]}" for i in range(num_azs)]
 
         # Create AZ objects
-        az_map: Dict[str, AvailabilityZone] = {}
-        availability_zones = []
-        for az_name in az_names:
-            az = AvailabilityZone(
+        availability_zones = [
+            AvailabilityZone(
                 name=az_name,
                 short_name=self._get_az_short_name(az_name),
                 subnets=[],
             )
-            az_map[az_name] = az
-            availability_zones.append(az)
+            for az_name in az_names
+        ]
+        az_map: Dict[str, AvailabilityZone] = {az.name: az for az in availability_zones}
 
         # Distribute subnets to AZs
         type_order = {"public": 0, "private": 1, "database": 2, "unknown": 3}
         unassigned: List[Subnet] = []
+        # Detected suffix -> first AZ whose short name matches it (None if none);
+        # many subnets share a suffix, so each AZ list is scanned once per suffix
+        suffix_azs: Dict[str, Optional[AvailabilityZone]] = {}
 
         for r, subnet, az_key in sorted(
             all_subnets, key=lambda x: (type_order.get(x[1].subnet_type, 3), x[1].name)
@@ -978,13 +1037,19 @@ class VPCStructureBuilder:
             elif az_key and az_key.startswith("detected-"):
                 # Try to match by suffix
                 suffix = az_key.replace("detected-", "")
-                matched = False
-                for az in availability_zones:
-                    if az.short_name == suffix or suffix in az.short_name:
-                        az.subnets.append(subnet)
-                        matched = True
-                        break
-                if not matched:
+                if suffix not in suffix_azs:
+                    suffix_azs[suffix] = next(
+                        (
+                            az
+                            for az in availability_zones
+                            if az.short_name == suffix or suffix in az.short_name
+                        ),
+                        None,
+                    )
+                matched_az = suffix_azs[suffix]
+                if matched_az is not None:
+                    matched_az.subnets.append(subnet)
+                else:
                     unassigned.append(subnet)
             else:
                 unassigned.append(subnet)
@@ -992,9 +1057,9 @@ class VPCStructureBuilder:
         # Distribute unassigned subnets round-robin by type
         if unassigned and availability_zones:
             # Group unassigned by type
-            unassigned_by_type: Dict[str, List[Subnet]] = {}
+            unassigned_by_type: Dict[str, List[Subnet]] = defaultdict(list)
             for subnet in unassigned:
-                unassigned_by_type.setdefault(subnet.subnet_type, []).append(subnet)
+                unassigned_by_type[subnet.subnet_type].append(subnet)
 
             # Distribute each type across AZs
             az_letters = "abcdef"
@@ -1009,25 +1074,20 @@ class VPCStructureBuilder:
                     availability_zones[az_idx].subnets.append(subnet)
 
         # Collect VPC endpoints
-        endpoints = []
-        for r in resources:
-            if r.resource_type != "aws_vpc_endpoint":
-                continue
-
-            endpoint_name = r.attributes.get("name", r.resource_name)
-            if resolver and isinstance(endpoint_name, str):
-                endpoint_name = resolver.resolve(endpoint_name)
-
-            endpoint = VPCEndpoint(
+        endpoints = [
+            VPCEndpoint(
                 resource_id=r.full_id,
-                name=endpoint_name,
+                name=self._resolve_name(r, resolver),
                 endpoint_type=self._detect_endpoint_type(r),
-                service=self._detect_endpoint_service(r),
+                service=sys.intern(self._detect_endpoint_service(r)),
             )
-            endpoints.append(endpoint)
+            for r in buckets["aws_vpc_endpoint"]
+        ]
 
         # Resolve route table associations for subnets
-        self._resolve_route_table_names(resources, availability_zones)
+        self._resolve_route_table_names(
+            buckets["aws_route_table"], buckets["aws_route_table_association"], availability_zones
+        )
 
         return VPCStructure(
             vpc_id=vpc_resource.full_id,
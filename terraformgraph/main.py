@@ -384,7 +384,7 @@ Examples:
         print(f"Diagram generated: {output_path.absolute()}")
         print("\nSummary:")
         print(f"  Services: {len(aggregated.services)}")
-        print(f"  Resources: {sum(len(s.resources) for s in aggregated.services)}")
+        print(f"  Resources: {aggregated.total_resources}")
         print(f"  Connections: {len(aggregated.connections)}")
 
     except RuntimeError as e:
@@ -10,7 +10,9 @@ Generates interactive HTML diagrams with:
 import html
 import json
 import re
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from .aggregator import AggregatedResult, LogicalConnection, LogicalService, ResourceAggregator
 from .icons import IconMapper
@@ -19,6 +21,36 @@ from .layout import LayoutConfig, Position, ServiceGroup
 if TYPE_CHECKING:
     from .aggregator import Subnet, VPCEndpoint, VPCStructure
 
+_STATIC_DIR = Path(__file__).parent / "static"
+
+
+@lru_cache(maxsize=None)
+def _load_stylesheet() -> str:
+    """Return the interactive page stylesheet, read from disk once per process."""
+    return (_STATIC_DIR / "diagram.css").read_text(encoding="utf-8")
+
+
+# %%NAME%% markers in HTML_TEMPLATE, substituted by _fill_template()
+_RE_PLACEHOLDER = re.compile(r"%%([A-Z_]+)%%")
+
+
+@lru_cache(maxsize=None)
+def _split_template(template: str) -> Tuple[str, ...]:
+    """Split a template into literal text and placeholder names (odd indices)."""
+    return tuple(_RE_PLACEHOLDER.split(template))
+
+
+def _fill_template(template: str, values: Dict[str, str]) -> str:
+    """Substitute %%NAME%% placeholders in a single pass.
+
+    Unlike str.format this needs no brace escaping in the embedded CSS/JS, and
+    substituted values are never rescanned, so a placeholder-like string inside
+    the SVG is left untouched.
+    """
+    parts = list(_split_template(template))
+    parts[1::2] = [values[name] for name in parts[1::2]]
+    return "".join(parts)
+
 
 class SVGRenderer:
     """Renders infrastructure diagrams as SVG."""
@@ -26,6 +58,8 @@ class SVGRenderer:
     def __init__(self, icon_mapper: IconMapper, config: Optional[LayoutConfig] = None):
         self.icon_mapper = icon_mapper
         self.config = config or LayoutConfig()
+        # (viewBox, content) -> symbol id for icons emitted once in <defs>
+        self._icon_symbols: Dict[Tuple[str, str], str] = {}
 
     def render_svg(
         self,
@@ -35,25 +69,36 @@ class SVGRenderer:
         groups: List[ServiceGroup],
         vpc_structure: Optional["VPCStructure"] = None,
         actual_height: Optional[int] = None,
+        canvas_connections: bool = False,
     ) -> str:
-        """Generate SVG content for the diagram."""
+        """Generate SVG content for the diagram.
+
+        When ``canvas_connections`` is set, a canvas is embedded above the
+        connections layer so the HTML page can paint connection lines there;
+        the SVG connection paths are still emitted for hit-testing and export.
+        """
         svg_parts = []
+        self._icon_symbols = {}
 
         # Use actual height if provided (from layout engine), otherwise use config
         canvas_height = actual_height if actual_height else self.config.canvas_height
 
+        svg_class = ' class="canvas-connections"' if canvas_connections else ""
+
         # SVG header with responsive viewBox
         # width="100%" allows SVG to scale to container, preserveAspectRatio maintains proportions
         svg_parts.append(
             f"""<svg id="diagram-svg" xmlns="http://www.w3.org/2000/svg"
             xmlns:xlink="http://www.w3.org/1999/xlink"
             viewBox="0 0 {self.config.canvas_width} {canvas_height}"
-            width="100%" preserveAspectRatio="xMidYMin meet"
+            width="100%" preserveAspectRatio="xMidYMin meet"{svg_class}
             style="max-width: {self.config.canvas_width}px;">"""
         )
 
         # Defs for arrows and filters
         svg_parts.append(self._render_defs())
+        # Icon symbols are collected while rendering and inserted here at the end
+        icon_defs_index = len(svg_parts)
 
         # Background
         svg_parts.append("""<rect width="100%" height="100%" fill="#f8f9fa"/>""")
@@ -101,6 +146,16 @@ class SVGRenderer:
                 )
         svg_parts.append("</g>")
 
+        # Canvas overlay for connection lines (large diagrams only)
+        if canvas_connections:
+            svg_parts.append(
+                f'<foreignObject id="conn-canvas-host" x="0" y="0" '
+                f'width="{self.config.canvas_width}" height="{canvas_height}" '
+                f'pointer-events="none">'
+                f'<canvas xmlns="http://www.w3.org/1999/xhtml" id="conn-canvas"></canvas>'
+                f"</foreignObject>"
+            )
+
         # Render VPC endpoints layer
         if vpc_structure:
             svg_parts.append('<g id="endpoints-layer">')
@@ -128,6 +183,9 @@ class SVGRenderer:
                 )
         svg_parts.append("</g>")
 
+        if self._icon_symbols:
+            svg_parts.insert(icon_defs_index, self._render_icon_symbols())
+
         svg_parts.append("</svg>")
 
         return "\n".join(svg_parts)
@@ -162,6 +220,23 @@ class SVGRenderer:
         </defs>
         """
 
+    def _icon_symbol_id(self, icon_content: str, viewbox: str) -> str:
+        """Register an icon as a shared <symbol> and return its id."""
+        key = (viewbox, icon_content)
+        symbol_id = self._icon_symbols.get(key)
+        if symbol_id is None:
+            symbol_id = f"icon-{len(self._icon_symbols)}"
+            self._icon_symbols[key] = symbol_id
+        return symbol_id
+
+    def _render_icon_symbols(self) -> str:
+        """Render each distinct icon once so services can reference it with <use>."""
+        symbols = [
+            f'<symbol id="{symbol_id}" viewBox="{viewbox}">{content}</symbol>'
+            for (viewbox, content), symbol_id in self._icon_symbols.items()
+        ]
+        return "<defs>\n" + "\n".join(symbols) + "\n</defs>"
+
     def _render_group(self, group: ServiceGroup) -> str:
         """Render a group container (AWS Cloud, VPC, AZ)."""
         if not group.position:
@@ -302,14 +377,14 @@ class SVGRenderer:
         if icon_content:
             # Use official AWS icon
             icon_size = 32
+            symbol_id = self._icon_symbol_id(icon_content, "0 0 48 48")
             return f"""
             <g class="vpc-endpoint endpoint-{endpoint_info.endpoint_type}" data-endpoint-id="{html.escape(endpoint_id)}">
                 <rect x="{pos.x}" y="{pos.y}" width="{box_width}" height="{box_height}"
                     fill="white" stroke="#e0e0e0" stroke-width="1" rx="6" ry="6"
                     filter="url(#shadow)"/>
-                <svg x="{cx - icon_size/2}" y="{pos.y + 6}" width="{icon_size}" height="{icon_size}" viewBox="0 0 48 48">
-                    {icon_content}
-                </svg>
+                <use href="#{symbol_id}" xlink:href="#{symbol_id}"
+                    x="{cx - icon_size/2}" y="{pos.y + 6}" width="{icon_size}" height="{icon_size}"/>
                 <text x="{cx}" y="{pos.y + 48}"
                     font-family="Arial, sans-serif" font-size="10" fill="#333"
                     text-anchor="middle" font-weight="bold">
@@ -399,19 +474,20 @@ class SVGRenderer:
         if icon_svg:
             icon_content = self._extract_svg_content(icon_svg)
             icon_viewbox = self._extract_svg_viewbox(icon_svg)
+            symbol_id = self._icon_symbol_id(icon_content, icon_viewbox)
 
             svg = f"""
             <g class="service draggable" data-service-id="{html.escape(service.id)}"
                data-service-type="{html.escape(service.service_type)}"
                data-tooltip="{html.escape(tooltip)}" data-is-vpc="{is_vpc_service}" {subnet_attr}
+               data-x="{pos.x}" data-y="{pos.y}"
                transform="translate({pos.x}, {pos.y})" style="cursor: grab;">
                 <rect class="service-bg" x="-8" y="-8"
                     width="{pos.width + 16}" height="{pos.height + 36}"
                     fill="white" stroke="#e0e0e0" stroke-width="1" rx="8" ry="8"
                     filter="url(#shadow)"/>
-                <svg class="service-icon" width="{pos.width}" height="{pos.height}" viewBox="{icon_viewbox}">
-                    {icon_content}
-                </svg>
+                <use class="service-icon" href="#{symbol_id}" xlink:href="#{symbol_id}"
+                    width="{pos.width}" height="{pos.height}"/>
                 <text class="service-label" x="{pos.width/2}" y="{pos.height + 16}"
                     font-family="Arial, sans-serif" font-size="12" fill="#333"
                     text-anchor="middle" font-weight="500">
@@ -425,6 +501,7 @@ class SVGRenderer:
             <g class="service draggable" data-service-id="{html.escape(service.id)}"
                data-service-type="{html.escape(service.service_type)}"
                data-tooltip="{html.escape(tooltip)}" data-is-vpc="{is_vpc_service}" {subnet_attr}
+               data-x="{pos.x}" data-y="{pos.y}"
                transform="translate({pos.x}, {pos.y})" style="cursor: grab;">
                 <rect class="service-bg" x="-8" y="-8"
                     width="{pos.width + 16}" height="{pos.height + 36}"
@@ -544,532 +621,7 @@ class HTMLRenderer:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>AWS Infrastructure Diagram</title>
     <style>
-        * {{ box-sizing: border-box; }}
-        body {{
-            margin: 0;
-            padding: 20px;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #2d2d2d;
-            min-height: 100vh;
-        }}
-        .container {{
-            max-width: 1500px;
-            margin: 0 auto;
-        }}
-        .header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 20px;
-            padding: 20px 25px;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 24px;
-            color: #232f3e;
-        }}
-        .header .subtitle {{
-            margin: 4px 0 0 0;
-            font-size: 14px;
-            color: #666;
-        }}
-        .header-right {{
-            display: flex;
-            align-items: center;
-            gap: 20px;
-        }}
-        .stats {{
-            display: flex;
-            gap: 30px;
-        }}
-        .stat {{
-            text-align: center;
-        }}
-        .stat-value {{
-            font-size: 28px;
-            font-weight: bold;
-            color: #8c4fff;
-        }}
-        .stat-label {{
-            font-size: 12px;
-            color: #666;
-            text-transform: uppercase;
-        }}
-        .export-buttons {{
-            display: flex;
-            gap: 10px;
-        }}
-        .export-btn {{
-            padding: 10px 16px;
-            border: none;
-            border-radius: 8px;
-            font-size: 13px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        .export-btn-primary {{
-            background: #8c4fff;
-            color: white;
-        }}
-        .export-btn-primary:hover {{
-            background: #7a3de8;
-        }}
-        .export-btn-secondary {{
-            background: #e9ecef;
-            color: #333;
-        }}
-        .export-btn-secondary:hover {{
-            background: #dee2e6;
-        }}
-        .diagram-container {{
-            background: #f8f9fa;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            overflow: hidden;
-            position: relative;
-        }}
-        .toolbar {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 12px 20px;
-            background: #f8f9fa;
-            border-bottom: 1px solid #e9ecef;
-        }}
-        .toolbar-info {{
-            font-size: 13px;
-            color: #666;
-        }}
-        .toolbar-actions {{
-            display: flex;
-            gap: 10px;
-        }}
-        .toolbar-btn {{
-            padding: 6px 12px;
-            border: 1px solid #ddd;
-            background: white;
-            border-radius: 6px;
-            font-size: 12px;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        .toolbar-btn:hover {{
-            background: #f0f0f0;
-            border-color: #ccc;
-        }}
-        .diagram-wrapper {{
-            padding: 10px;
-            overflow: visible;
-        }}
-        .diagram-wrapper svg {{
-            display: block;
-            margin: 0 auto;
-            width: 100%;
-            height: auto;
-            max-height: none;
-        }}
-        @media (max-width: 1200px) {{
-            .header {{
-                flex-direction: column;
-                gap: 15px;
-            }}
-            .header-right {{
-                flex-direction: column;
-                width: 100%;
-            }}
-            .stats {{
-                justify-content: center;
-            }}
-            .export-buttons {{
-                justify-content: center;
-            }}
-        }}
-        @media (max-width: 768px) {{
-            body {{
-                padding: 10px;
-            }}
-            .header h1 {{
-                font-size: 18px;
-            }}
-            .stats {{
-                gap: 15px;
-            }}
-            .stat-value {{
-                font-size: 20px;
-            }}
-            .legend-grid {{
-                grid-template-columns: 1fr;
-            }}
-        }}
-        .service.dragging {{
-            opacity: 0.8;
-            cursor: grabbing !important;
-        }}
-        .service:hover .service-bg {{
-            stroke: #8c4fff;
-            stroke-width: 2;
-        }}
-        /* Highlighting states */
-        .service.highlighted .service-bg {{
-            stroke: #8c4fff;
-            stroke-width: 3;
-            filter: url(#shadow) drop-shadow(0 0 8px rgba(140, 79, 255, 0.5));
-        }}
-        .service.dimmed {{
-            opacity: 0.3;
-        }}
-        .connection.highlighted .connection-path {{
-            stroke-width: 3 !important;
-            opacity: 1 !important;
-        }}
-        .connection.dimmed {{
-            opacity: 0.1 !important;
-        }}
-        .connection {{
-            cursor: pointer;
-        }}
-        .connection:hover .connection-path {{
-            stroke-width: 3;
-            opacity: 1;
-        }}
-        .connection-hitarea {{
-            stroke: transparent;
-            stroke-width: 15;
-            fill: none;
-            cursor: pointer;
-        }}
-        /* Spoke connection styles */
-        .spoke-connection {{
-            cursor: pointer;
-            transition: opacity 0.2s;
-        }}
-        .spoke-connection:hover .spoke-path {{
-            stroke-width: 4 !important;
-            opacity: 1 !important;
-        }}
-        .spoke-connection.highlighted .spoke-path {{
-            stroke-width: 4 !important;
-            opacity: 1 !important;
-        }}
-        .spoke-connection.dimmed {{
-            opacity: 0.15 !important;
-        }}
-        .spoke-hitarea {{
-            stroke: transparent;
-            stroke-width: 20;
-            fill: none;
-            cursor: pointer;
-        }}
-        /* Spoke rays - subtle lines from edge point to service icons */
-        .spoke-ray {{
-            stroke: #bbb;
-            stroke-width: 1;
-            opacity: 0.3;
-            transition: opacity 0.2s, stroke 0.2s;
-        }}
-        .spoke-rays.highlighted .spoke-ray {{
-            opacity: 0.6;
-            stroke: #888;
-        }}
-        .spoke-ray.highlighted {{
-            opacity: 0.8 !important;
-            stroke: #666 !important;
-            stroke-width: 1.5 !important;
-        }}
-        .spoke-ray.dimmed {{
-            opacity: 0.1 !important;
-        }}
-        .legend {{
-            margin-top: 20px;
-            padding: 20px 25px;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .legend h3 {{
-            margin: 0 0 15px 0;
-            font-size: 16px;
-            color: #232f3e;
-        }}
-        .legend-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-        }}
-        .legend-section h4 {{
-            margin: 0 0 10px 0;
-            font-size: 13px;
-            color: #666;
-            text-transform: uppercase;
-        }}
-        .legend-items {{
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-        }}
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            font-size: 13px;
-        }}
-        .legend-line {{
-            width: 36px;
-            height: 14px;
-            flex-shrink: 0;
-        }}
-        .legend-line svg {{
-            display: block;
-        }}
-        .legend-box {{
-            width: 24px;
-            height: 16px;
-            border-radius: 3px;
-            border: 1.5px solid;
-        }}
-        .legend-circle {{
-            width: 20px;
-            height: 20px;
-            border-radius: 50%;
-        }}
-        .tooltip {{
-            position: fixed;
-            padding: 10px 14px;
-            background: #232f3e;
-            color: white;
-            border-radius: 6px;
-            font-size: 13px;
-            pointer-events: none;
-            z-index: 1000;
-            display: none;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.3);
-        }}
-        .export-modal {{
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0,0,0,0.5);
-            z-index: 2000;
-            justify-content: center;
-            align-items: center;
-        }}
-        .export-modal.active {{
-            display: flex;
-        }}
-        .export-modal-content {{
-            background: white;
-            padding: 30px;
-            border-radius: 12px;
-            text-align: center;
-            max-width: 400px;
-        }}
-        .export-modal h3 {{
-            margin: 0 0 20px 0;
-        }}
-        .export-preview {{
-            max-width: 100%;
-            border: 1px solid #ddd;
-            border-radius: 8px;
-            margin-bottom: 20px;
-        }}
-        .export-modal-actions {{
-            display: flex;
-            gap: 10px;
-            justify-content: center;
-        }}
-        .highlight-info {{
-            position: fixed;
-            bottom: 20px;
-            right: 20px;
-            padding: 15px 20px;
-            background: #232f3e;
-            color: white;
-            border-radius: 10px;
-            font-size: 14px;
-            line-height: 1.6;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-            z-index: 1000;
-            display: none;
-            max-width: 280px;
-        }}
-        .highlight-info strong {{
-            color: #8c4fff;
-        }}
-        .highlight-info small {{
-            color: #999;
-            display: block;
-            margin-top: 8px;
-            font-size: 11px;
-        }}
-        /* ============ AGGREGATION UI ============ */
-        .aggregation-panel {{
-            margin-top: 15px;
-            padding: 15px 20px;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            display: flex;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        .aggregation-panel-label {{
-            font-size: 13px;
-            font-weight: 600;
-            color: #232f3e;
-            margin-right: 5px;
-        }}
-        .aggregation-chip {{
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.2s;
-            user-select: none;
-            border: 2px solid;
-        }}
-        .aggregation-chip.active {{
-            color: white;
-        }}
-        .aggregation-chip.inactive {{
-            background: transparent;
-        }}
-        .aggregation-chip:hover {{
-            transform: translateY(-1px);
-            box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-        }}
-        .aggregation-chip .chip-check {{
-            font-size: 11px;
-        }}
-        /* Aggregate node styles */
-        .aggregate-node .service-bg {{
-            stroke-dasharray: 6,3 !important;
-            stroke-width: 2 !important;
-        }}
-        .aggregate-node {{
-            cursor: pointer;
-        }}
-        .aggregate-badge {{
-            pointer-events: none;
-        }}
-        /* Aggregate connection styles */
-        .aggregate-connection .connection-path {{
-            opacity: 0.6;
-        }}
-        .aggregate-connection .multiplicity-label {{
-            font-family: Arial, sans-serif;
-            font-size: 10px;
-            font-weight: bold;
-            fill: #666;
-        }}
-        /* Popover styles */
-        .aggregate-popover {{
-            position: fixed;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 8px 30px rgba(0,0,0,0.2);
-            z-index: 1500;
-            max-height: 300px;
-            overflow-y: auto;
-            min-width: 220px;
-            padding: 8px 0;
-        }}
-        .aggregate-popover-header {{
-            padding: 8px 16px;
-            font-size: 12px;
-            font-weight: 600;
-            color: #666;
-            border-bottom: 1px solid #eee;
-            text-transform: uppercase;
-        }}
-        .aggregate-popover-item {{
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            padding: 8px 16px;
-            cursor: pointer;
-            font-size: 13px;
-            color: #333;
-            transition: background 0.15s;
-        }}
-        .aggregate-popover-item:hover {{
-            background: #f5f5f5;
-        }}
-        .aggregate-popover-item.selected {{
-            background: #ede7f6;
-            color: #6200ea;
-            font-weight: 500;
-        }}
-        .aggregate-popover-item svg {{
-            width: 24px;
-            height: 24px;
-            flex-shrink: 0;
-        }}
-        /* Transition animations for aggregation */
-        .service.agg-hidden {{
-            display: none !important;
-        }}
-        .connection.agg-hidden {{
-            display: none !important;
-        }}
-        .connection.conn-type-hidden {{
-            display: none !important;
-        }}
-        /* ============ CONNECTION TYPE FILTER UI ============ */
-        .conn-filter-panel {{
-            margin-top: 15px;
-            padding: 15px 20px;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            display: flex;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        .conn-filter-panel-label {{
-            font-size: 13px;
-            font-weight: 600;
-            color: #232f3e;
-            margin-right: 5px;
-        }}
-        .conn-filter-chip {{
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.2s;
-            user-select: none;
-            border: 2px solid;
-        }}
-        .conn-filter-chip.active {{
-            color: white;
-        }}
-        .conn-filter-chip.inactive {{
-            background: transparent;
-        }}
-        .conn-filter-chip:hover {{
-            transform: translateY(-1px);
-            box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-        }}
-        .conn-filter-chip .chip-check {{
-            font-size: 11px;
-        }}
+%%STYLESHEET%%
     </style>
 </head>
 <body>
@@ -1077,25 +629,26 @@ class HTMLRenderer:
         <div class="header">
             <div>
                 <h1>AWS Infrastructure Diagram</h1>
-                <p class="subtitle">Environment: {environment} | Drag icons to reposition</p>
+                <p class="subtitle">Environment: %%ENVIRONMENT%% | Drag icons to reposition</p>
             </div>
             <div class="header-right">
                 <div class="stats">
                     <div class="stat">
-                        <div class="stat-value">{service_count}</div>
+                        <div class="stat-value">%%SERVICE_COUNT%%</div>
                         <div class="stat-label">Services</div>
                     </div>
                     <div class="stat">
-                        <div class="stat-value">{resource_count}</div>
+                        <div class="stat-value">%%RESOURCE_COUNT%%</div>
                         <div class="stat-label">Resources</div>
                     </div>
                     <div class="stat">
-                        <div class="stat-value">{connection_count}</div>
+                        <div class="stat-value">%%CONNECTION_COUNT%%</div>
                         <div class="stat-label">Connections</div>
                     </div>
                 </div>
                 <div class="export-buttons">
                     <button class="export-btn export-btn-secondary" onclick="exportAs('png')">Export PNG</button>
+                    <button class="export-btn export-btn-secondary" onclick="exportAs('webp')">Export WebP</button>
                     <button class="export-btn export-btn-primary" onclick="exportAs('jpg')">Export JPG</button>
                 </div>
             </div>
@@ -1110,7 +663,7 @@ class HTMLRenderer:
                 </div>
             </div>
             <div class="diagram-wrapper" id="diagram-wrapper">
-                {svg_content}
+                %%SVG_CONTENT%%
             </div>
         </div>
         <div class="aggregation-panel" id="aggregation-panel" style="display:none;">
@@ -1192,6 +745,7 @@ class HTMLRenderer:
     </div>
     <div class="tooltip" id="tooltip"></div>
     <div class="highlight-info" id="highlight-info"></div>
+    <div class="toast" id="toast"></div>
     <div class="export-modal" id="export-modal">
         <div class="export-modal-content">
             <h3>Export Diagram</h3>
@@ -1206,52 +760,66 @@ class HTMLRenderer:
 
     <script>
         // Aggregation configuration (injected by Python)
-        const AGGREGATION_CONFIG = {aggregation_config_json};
+        const AGGREGATION_CONFIG = %%AGGREGATION_CONFIG_JSON%%;
     </script>
     <script>
         // Service positions storage
-        const servicePositions = {{}};
-        const iconSize = {icon_size};
-        let originalPositions = {{}};
+        const servicePositions = {};
+        const iconSize = %%ICON_SIZE%%;
+        const CANVAS_CONNECTIONS = %%CANVAS_CONNECTIONS%%;
+        let originalPositions = {};
+        // serviceId -> service element, so lookups avoid the selector engine
+        const serviceEls = new Map();
 
         // Initialize
-        document.addEventListener('DOMContentLoaded', () => {{
+        document.addEventListener('DOMContentLoaded', () => {
             initDragAndDrop();
             initTooltips();
             initHighlighting();
             updateAllConnections();
             saveOriginalPositions();
+            initConnectionCanvas();
             initAggregation();
             initConnectionTypeFilter();
-        }});
+        });
 
-        function saveOriginalPositions() {{
-            document.querySelectorAll('.service').forEach(el => {{
+        function saveOriginalPositions() {
+            document.querySelectorAll('.service').forEach(el => {
                 const id = el.dataset.serviceId;
-                const transform = el.getAttribute('transform');
-                const match = transform.match(/translate\\(([^,]+),\\s*([^)]+)\\)/);
-                if (match) {{
-                    originalPositions[id] = {{ x: parseFloat(match[1]), y: parseFloat(match[2]) }};
-                    servicePositions[id] = {{ ...originalPositions[id] }};
-                }}
-            }});
-        }}
-
-        function initDragAndDrop() {{
+                serviceEls.set(id, el);
+                // Initial coordinates are emitted as numeric attributes by the renderer
+                if (el.dataset.x !== undefined && el.dataset.y !== undefined) {
+                    originalPositions[id] = { x: +el.dataset.x, y: +el.dataset.y };
+                    setServicePosition(id, originalPositions[id].x, originalPositions[id].y);
+                }
+            });
+        }
+
+        // Positions are updated in place so drag frames do not allocate a new object per move
+        function setServicePosition(id, x, y) {
+            const pos = servicePositions[id];
+            if (pos) {
+                pos.x = x;
+                pos.y = y;
+            } else {
+                servicePositions[id] = { x, y };
+            }
+        }
+
+        function initDragAndDrop() {
             const svg = document.getElementById('diagram-svg');
             let dragging = null;
-            let offset = {{ x: 0, y: 0 }};
+            let offset = { x: 0, y: 0 };
 
-            // Use event delegation on SVG for mousedown to handle dynamically created nodes
-            svg.addEventListener('mousedown', (e) => {{
+            // Use event delegation on SVG for pointerdown to handle dynamically created nodes.
+            // The dragged node then captures the pointer, so move/up events are delivered to it
+            // directly instead of being hit-tested against the whole scene.
+            svg.addEventListener('pointerdown', (e) => {
                 const target = e.target.closest('.service.draggable');
                 if (target) startDrag(e, target);
-            }});
-            svg.addEventListener('mousemove', drag);
-            svg.addEventListener('mouseup', endDrag);
-            svg.addEventListener('mouseleave', endDrag);
+            });
 
-            function startDrag(e, targetEl) {{
+            function startDrag(e, targetEl) {
                 e.preventDefault();
 
                 // Guard against null CTM (can happen during rendering)
@@ -1268,23 +836,28 @@ class HTMLRenderer:
                 const svgP = pt.matrixTransform(ctm.inverse());
 
                 // Validate coordinates to prevent NaN issues
-                if (isNaN(svgP.x) || isNaN(svgP.y)) {{
+                if (isNaN(svgP.x) || isNaN(svgP.y)) {
                     dragging.classList.remove('dragging');
                     dragging.style.cursor = 'grab';
                     dragging = null;
                     return;
-                }}
+                }
 
                 const id = dragging.dataset.serviceId;
-                const pos = servicePositions[id] || {{ x: 0, y: 0 }};
+                const pos = servicePositions[id] || { x: 0, y: 0 };
                 offset.x = svgP.x - pos.x;
                 offset.y = svgP.y - pos.y;
 
+                dragging.setPointerCapture(e.pointerId);
+                dragging.addEventListener('pointermove', drag);
+                dragging.addEventListener('pointerup', endDrag);
+                dragging.addEventListener('lostpointercapture', endDrag);
+
                 // Hide tooltip while dragging
                 document.getElementById('tooltip').style.display = 'none';
-            }}
+            }
 
-            function drag(e) {{
+            function drag(e) {
                 if (!dragging) return;
 
                 // Guard against null CTM
@@ -1304,10 +877,10 @@ class HTMLRenderer:
 
                 // Check if service belongs to a specific subnet
                 const subnetId = dragging.dataset.subnetId;
-                if (subnetId) {{
+                if (subnetId) {
                     // Constrain to subnet bounds
-                    const subnetGroup = document.querySelector(`.subnet[data-subnet-id="${{subnetId}}"]`);
-                    if (subnetGroup) {{
+                    const subnetGroup = document.querySelector(`.subnet[data-subnet-id="${subnetId}"]`);
+                    if (subnetGroup) {
                         const padding = 10;
                         const minX = parseFloat(subnetGroup.dataset.minX) + padding;
                         const minY = parseFloat(subnetGroup.dataset.minY) + padding;
@@ -1316,11 +889,11 @@ class HTMLRenderer:
 
                         newX = Math.max(minX, Math.min(maxX, newX));
                         newY = Math.max(minY, Math.min(maxY, newY));
-                    }}
-                }} else if (dragging.dataset.isVpc === 'true') {{
+                    }
+                } else if (dragging.dataset.isVpc === 'true') {
                     // Constrain to VPC bounds
                     const vpcGroup = document.querySelector('.group-vpc .group-bg');
-                    if (vpcGroup) {{
+                    if (vpcGroup) {
                         const minX = parseFloat(vpcGroup.dataset.minX) + 20;
                         const minY = parseFloat(vpcGroup.dataset.minY) + 40;
                         const maxX = parseFloat(vpcGroup.dataset.maxX) - iconSize - 20;
@@ -1330,15 +903,15 @@ class HTMLRenderer:
                         newY = Math.max(minY, Math.min(maxY, newY));
 
                         // VPC services without subnet assignment cannot enter subnet areas
-                        if (!dragging.dataset.subnetId) {{
-                            document.querySelectorAll('.subnet').forEach(sub => {{
+                        if (!dragging.dataset.subnetId) {
+                            document.querySelectorAll('.subnet').forEach(sub => {
                                 const sMinX = parseFloat(sub.dataset.minX);
                                 const sMinY = parseFloat(sub.dataset.minY);
                                 const sMaxX = parseFloat(sub.dataset.maxX);
                                 const sMaxY = parseFloat(sub.dataset.maxY);
                                 const nodeR = newX + iconSize;
                                 const nodeB = newY + iconSize;
-                                if (nodeR > sMinX && newX < sMaxX && nodeB > sMinY && newY < sMaxY) {{
+                                if (nodeR > sMinX && newX < sMaxX && nodeB > sMinY && newY < sMaxY) {
                                     const dL = Math.abs(nodeR - sMinX);
                                     const dR = Math.abs(newX - sMaxX);
                                     const dT = Math.abs(nodeB - sMinY);
@@ -1348,14 +921,14 @@ class HTMLRenderer:
                                     else if (m === dB) newY = sMaxY;
                                     else if (m === dL) newX = sMinX - iconSize;
                                     else newX = sMaxX;
-                                }}
-                            }});
-                        }}
-                    }}
-                }} else {{
+                                }
+                            });
+                        }
+                    }
+                } else {
                     // AWS Cloud bounds - expandable downward
                     const cloudGroup = document.querySelector('.group-aws_cloud .group-bg');
-                    if (cloudGroup) {{
+                    if (cloudGroup) {
                         const minX = parseFloat(cloudGroup.dataset.minX) + 20;
                         const minY = parseFloat(cloudGroup.dataset.minY) + 40;
                         const maxX = parseFloat(cloudGroup.dataset.maxX) - iconSize - 20;
@@ -1367,7 +940,7 @@ class HTMLRenderer:
 
                         // Prevent global services from entering the VPC area
                         const vpcBg = document.querySelector('.group-vpc .group-bg');
-                        if (vpcBg) {{
+                        if (vpcBg) {
                             const vpcMinX = parseFloat(vpcBg.dataset.minX);
                             const vpcMinY = parseFloat(vpcBg.dataset.minY);
                             const vpcMaxX = parseFloat(vpcBg.dataset.maxX);
@@ -1377,7 +950,7 @@ class HTMLRenderer:
 
                             // Check if node overlaps VPC box
                             if (nodeRight > vpcMinX && newX < vpcMaxX &&
-                                nodeBottom > vpcMinY && newY < vpcMaxY) {{
+                                nodeBottom > vpcMinY && newY < vpcMaxY) {
                                 // Push to nearest edge outside VPC
                                 const distLeft = Math.abs(nodeRight - vpcMinX);
                                 const distRight = Math.abs(newX - vpcMaxX);
@@ -1389,34 +962,38 @@ class HTMLRenderer:
                                 else if (minDist === distBottom) newY = vpcMaxY;
                                 else if (minDist === distLeft) newX = vpcMinX - iconSize;
                                 else newX = vpcMaxX;
-                            }}
-                        }}
+                            }
+                        }
 
                         // Expand AWS Cloud box and canvas if dragging below current bounds
                         const requiredBottom = newY + iconSize + 40;
-                        if (requiredBottom > currentMaxY) {{
+                        if (requiredBottom > currentMaxY) {
                             expandCanvas(requiredBottom);
-                        }}
-                    }}
-                }}
+                        }
+                    }
+                }
 
                 const id = dragging.dataset.serviceId;
-                servicePositions[id] = {{ x: newX, y: newY }};
+                setServicePosition(id, newX, newY);
 
-                dragging.setAttribute('transform', `translate(${{newX}}, ${{newY}})`);
+                dragging.setAttribute('transform', `translate(${newX}, ${newY})`);
                 updateConnectionsFor(id);
-            }}
+            }
 
-            function endDrag() {{
-                if (dragging) {{
+            function endDrag() {
+                if (dragging) {
+                    dragging.removeEventListener('pointermove', drag);
+                    dragging.removeEventListener('pointerup', endDrag);
+                    dragging.removeEventListener('lostpointercapture', endDrag);
                     dragging.classList.remove('dragging');
                     dragging.style.cursor = 'grab';
                     dragging = null;
-                }}
-            }}
-        }}
+                    if (CANVAS_CONNECTIONS) scheduleConnectionCanvasRedraw();
+                }
+            }
+        }
 
-        function expandCanvas(newBottom) {{
+        function expandCanvas(newBottom) {
             const svg = document.getElementById('diagram-svg');
             const cloudGroup = document.querySelector('.group-aws_cloud .group-bg');
 
@@ -1428,14 +1005,14 @@ class HTMLRenderer:
 
             // Small margin below content (matching layout.py)
             const bottomMargin = 20;
-            const padding = {icon_size} > 64 ? 45 : 30;  // Approximate padding based on scale
+            const padding = %%ICON_SIZE%% > 64 ? 45 : 30;  // Approximate padding based on scale
             const newHeight = Math.max(currentHeight, newBottom + bottomMargin);
 
             // Only expand if needed
             if (newHeight <= currentHeight) return;
 
             // Update SVG viewBox - this automatically resizes the container
-            svg.setAttribute('viewBox', `${{viewBox[0]}} ${{viewBox[1]}} ${{viewBox[2]}} ${{newHeight}}`);
+            svg.setAttribute('viewBox', `${viewBox[0]} ${viewBox[1]} ${viewBox[2]} ${newHeight}`);
 
             // Expand AWS Cloud box to fill the entire canvas (minus margin)
             const minY = parseFloat(cloudGroup.dataset.minY);
@@ -1445,133 +1022,113 @@ class HTMLRenderer:
 
             // Update the AWS Cloud rect to fill the space
             const awsRect = document.querySelector('.group-aws_cloud rect');
-            if (awsRect) {{
+            if (awsRect) {
                 awsRect.setAttribute('height', newMaxY - minY);
-            }}
-        }}
+            }
+
+            if (CANVAS_CONNECTIONS) resizeConnectionCanvas();
+        }
 
-        var _baseUpdateConnectionsFor = function(serviceId) {{
-            document.querySelectorAll('.connection').forEach(conn => {{
-                if (conn.dataset.source === serviceId || conn.dataset.target === serviceId) {{
+        var _baseUpdateConnectionsFor = function(serviceId) {
+            document.querySelectorAll('.connection').forEach(conn => {
+                if (conn.dataset.source === serviceId || conn.dataset.target === serviceId) {
                     updateConnection(conn);
-                }}
-            }});
-        }};
+                }
+            });
+        };
         var updateConnectionsFor = _baseUpdateConnectionsFor;
 
-        function updateAllConnections() {{
+        function updateAllConnections() {
             document.querySelectorAll('.connection').forEach(updateConnection);
-        }}
+        }
 
-        function updateConnection(connEl) {{
-            const sourceId = connEl.dataset.source;
-            const targetId = connEl.dataset.target;
+        function updateConnection(connEl) {
+            if (CANVAS_CONNECTIONS) {
+                // Lines are painted on the canvas; SVG paths are synced once the drag settles
+                pendingConnectionPaths.add(connEl);
+                scheduleConnectionCanvasRedraw();
+                return;
+            }
+            writeConnectionPath(connEl);
+        }
 
-            const sourcePos = servicePositions[sourceId];
-            const targetPos = servicePositions[targetId];
+        function writeConnectionPath(connEl) {
+            const sourcePos = servicePositions[connEl.dataset.source];
+            const targetPos = servicePositions[connEl.dataset.target];
 
             if (!sourcePos || !targetPos) return;
 
-            // Calculate center points
+            // Build the path string once and share it between the visible path and its hit area
+            const path = calcConnectionPath(sourcePos, targetPos);
             const halfSize = iconSize / 2;
-            let sx = sourcePos.x + halfSize;
-            let sy = sourcePos.y + halfSize;
-            let tx = targetPos.x + halfSize;
-            let ty = targetPos.y + halfSize;
-
-            // Adjust to connect from edges
-            if (Math.abs(ty - sy) > Math.abs(tx - sx)) {{
-                // Mostly vertical
-                if (ty > sy) {{
-                    sy = sourcePos.y + iconSize + 8;
-                    ty = targetPos.y - 8;
-                }} else {{
-                    sy = sourcePos.y - 8;
-                    ty = targetPos.y + iconSize + 8;
-                }}
-            }} else {{
-                // Mostly horizontal
-                if (tx > sx) {{
-                    sx = sourcePos.x + iconSize + 8;
-                    tx = targetPos.x - 8;
-                }} else {{
-                    sx = sourcePos.x - 8;
-                    tx = targetPos.x + iconSize + 8;
-                }}
-            }}
-
-            // Quadratic curve path (matches server-side rendering)
-            const midX = (sx + tx) / 2;
-            const midY = (sy + ty) / 2;
-            const path = `M ${{sx}} ${{sy}} Q ${{midX}} ${{sy}}, ${{midX}} ${{midY}} T ${{tx}} ${{ty}}`;
 
             const pathEl = connEl.querySelector('.connection-path');
             const hitareaEl = connEl.querySelector('.connection-hitarea');
-            if (pathEl) {{
+            if (pathEl) {
                 pathEl.setAttribute('d', path);
-            }}
-            if (hitareaEl) {{
+            }
+            if (hitareaEl) {
                 hitareaEl.setAttribute('d', path);
-            }}
+            }
 
             // Update multiplicity label position if present
             const multLabel = connEl.querySelector('.multiplicity-label');
-            if (multLabel) {{
+            if (multLabel) {
                 const labelMidX = (sourcePos.x + targetPos.x) / 2 + halfSize;
                 const labelMidY = (sourcePos.y + targetPos.y) / 2 + halfSize;
-                multLabel.setAttribute('x', `${{labelMidX + 8}}`);
-                multLabel.setAttribute('y', `${{labelMidY - 5}}`);
-            }}
-        }}
+                multLabel.setAttribute('x', `${labelMidX + 8}`);
+                multLabel.setAttribute('y', `${labelMidY - 5}`);
+            }
+        }
 
         // ============ HIGHLIGHTING SYSTEM ============
         let currentHighlight = null;
 
-        function initHighlighting() {{
+        function initHighlighting() {
             const svg = document.getElementById('diagram-svg');
 
             // Use event delegation on SVG for dynamic element support
-            svg.addEventListener('click', (e) => {{
+            svg.addEventListener('click', (e) => {
                 // Check if clicked on a service
                 const serviceEl = e.target.closest('.service');
-                if (serviceEl) {{
+                if (serviceEl) {
                     if (serviceEl.classList.contains('dragging')) return;
                     // Don't interfere with aggregate node popover (handled separately)
                     if (serviceEl.classList.contains('aggregate-node')) return;
                     e.stopPropagation();
 
                     const serviceId = serviceEl.dataset.serviceId;
-                    if (currentHighlight === serviceId) {{
+                    if (currentHighlight === serviceId) {
                         clearHighlights();
-                    }} else {{
+                    } else {
                         highlightService(serviceId);
-                    }}
+                    }
                     return;
-                }}
+                }
 
                 // Check if clicked on a connection
                 const connEl = e.target.closest('.connection');
-                if (connEl) {{
+                if (connEl) {
                     e.stopPropagation();
                     const sourceId = connEl.dataset.source;
                     const targetId = connEl.dataset.target;
-                    const connKey = `conn:${{sourceId}}->${{targetId}}`;
-                    if (currentHighlight === connKey) {{
+                    const connKey = `conn:${sourceId}->${targetId}`;
+                    if (currentHighlight === connKey) {
                         clearHighlights();
-                    }} else {{
+                    } else {
                         highlightConnection(connEl, sourceId, targetId);
-                    }}
+                    }
                     return;
-                }}
+                }
 
                 // Clicked on background
-                if (e.target.tagName === 'svg' || e.target.classList.contains('group-bg')) {{
+                if (e.target.tagName === 'svg' || e.target.classList.contains('group-bg')) {
                     clearHighlights();
-                }}
-            }});
-        }}
+                }
+            });
+        }
 
-        function highlightService(serviceId) {{
+        function highlightService(serviceId) {
             clearHighlights();
             currentHighlight = serviceId;
 
@@ -1579,219 +1136,389 @@ class HTMLRenderer:
             const connectedServiceIds = new Set([serviceId]);
             const connectedConnections = [];
 
-            document.querySelectorAll('.connection:not(.conn-type-hidden)').forEach(conn => {{
+            document.querySelectorAll('.connection:not(.conn-type-hidden)').forEach(conn => {
                 const srcId = conn.dataset.source;
                 const tgtId = conn.dataset.target;
 
-                if (srcId === serviceId || tgtId === serviceId) {{
+                if (srcId === serviceId || tgtId === serviceId) {
                     connectedServiceIds.add(srcId);
                     connectedServiceIds.add(tgtId);
                     connectedConnections.push(conn);
-                }}
-            }});
-
-            // Dim all services and connections
-            document.querySelectorAll('.service').forEach(el => {{
-                el.classList.add('dimmed');
-            }});
-            document.querySelectorAll('.connection').forEach(el => {{
-                el.classList.add('dimmed');
-            }});
-
-            // Highlight connected services
-            document.querySelectorAll('.service').forEach(el => {{
-                const elId = el.dataset.serviceId;
-                if (connectedServiceIds.has(elId)) {{
-                    el.classList.remove('dimmed');
-                    el.classList.add('highlighted');
-                }}
-            }});
-
-            // Highlight connections
-            connectedConnections.forEach(conn => {{
-                conn.classList.remove('dimmed');
-                conn.classList.add('highlighted');
-            }});
+                }
+            });
+
+            // Dim everything else via the root attribute; only the highlighted set is touched
+            document.getElementById('diagram-svg').dataset.highlight = serviceId;
+
+            connectedServiceIds.forEach(id => {
+                const el = serviceEls.get(id);
+                if (el) el.classList.add('highlighted');
+            });
+            connectedConnections.forEach(conn => conn.classList.add('highlighted'));
 
             // Show info tooltip
             showHighlightInfo(serviceId, connectedServiceIds.size - 1, connectedConnections.length);
-        }}
+        }
 
-        function highlightConnection(connEl, sourceId, targetId) {{
+        function highlightConnection(connEl, sourceId, targetId) {
             clearHighlights();
-            currentHighlight = `conn:${{sourceId}}->${{targetId}}`;
-
-            // Dim all
-            document.querySelectorAll('.service').forEach(el => {{
-                el.classList.add('dimmed');
-            }});
-            document.querySelectorAll('.connection').forEach(el => {{
-                el.classList.add('dimmed');
-            }});
-
-            // Highlight the connection
-            connEl.classList.remove('dimmed');
-            connEl.classList.add('highlighted');
+            currentHighlight = `conn:${sourceId}->${targetId}`;
 
-            // Highlight source and target services
-            const sourceEl = document.querySelector(`[data-service-id="${{sourceId}}"]`);
-            const targetEl = document.querySelector(`[data-service-id="${{targetId}}"]`);
+            // Dim everything else via the root attribute
+            document.getElementById('diagram-svg').dataset.highlight = currentHighlight;
 
-            if (sourceEl) {{
-                sourceEl.classList.remove('dimmed');
-                sourceEl.classList.add('highlighted');
-            }}
-            if (targetEl) {{
-                targetEl.classList.remove('dimmed');
-                targetEl.classList.add('highlighted');
-            }}
+            // Highlight the connection and its source and target services
+            connEl.classList.add('highlighted');
+
+            const sourceEl = serviceEls.get(sourceId);
+            const targetEl = serviceEls.get(targetId);
+            if (sourceEl) sourceEl.classList.add('highlighted');
+            if (targetEl) targetEl.classList.add('highlighted');
 
             // Show connection info
             const label = connEl.dataset.label || connEl.dataset.connType;
             const sourceName = sourceEl ? sourceEl.dataset.tooltip.split(' (')[0] : sourceId;
             const targetName = targetEl ? targetEl.dataset.tooltip.split(' (')[0] : targetId;
             showConnectionInfo(sourceName, targetName, label);
-        }}
+        }
 
-        function clearHighlights() {{
+        function clearHighlights() {
             currentHighlight = null;
 
-            document.querySelectorAll('.service').forEach(el => {{
-                el.classList.remove('dimmed', 'highlighted');
-            }});
-            document.querySelectorAll('.connection').forEach(el => {{
-                el.classList.remove('dimmed', 'highlighted');
-            }});
+            const svg = document.getElementById('diagram-svg');
+            delete svg.dataset.highlight;
+            svg.querySelectorAll('.service.highlighted, .connection.highlighted').forEach(el => {
+                el.classList.remove('highlighted');
+            });
 
             hideHighlightInfo();
-        }}
+        }
 
-        function showHighlightInfo(serviceId, connectedCount, connectionCount) {{
-            const el = document.querySelector(`[data-service-id="${{serviceId}}"]`);
+        function showHighlightInfo(serviceId, connectedCount, connectionCount) {
+            const el = serviceEls.get(serviceId);
             const name = el ? el.dataset.tooltip.split(' (')[0] : serviceId;
 
             const infoEl = document.getElementById('highlight-info');
             infoEl.innerHTML = `
-                <strong>${{name}}</strong><br>
-                Connected to ${{connectedCount}} service${{connectedCount !== 1 ? 's' : ''}}<br>
-                ${{connectionCount}} connection${{connectionCount !== 1 ? 's' : ''}}
+                <strong>${name}</strong><br>
+                Connected to ${connectedCount} service${connectedCount !== 1 ? 's' : ''}<br>
+                ${connectionCount} connection${connectionCount !== 1 ? 's' : ''}
                 <br><small>Click elsewhere to clear</small>
             `;
             infoEl.style.display = 'block';
-        }}
+        }
 
-        function showConnectionInfo(sourceName, targetName, label) {{
+        function showConnectionInfo(sourceName, targetName, label) {
             const infoEl = document.getElementById('highlight-info');
             infoEl.innerHTML = `
-                <strong>${{sourceName}}</strong><br>
-                ↓ ${{label}}<br>
-                <strong>${{targetName}}</strong>
+                <strong>${sourceName}</strong><br>
+                ↓ ${label}<br>
+                <strong>${targetName}</strong>
                 <br><small>Click elsewhere to clear</small>
             `;
             infoEl.style.display = 'block';
-        }}
+        }
 
-        function hideHighlightInfo() {{
+        function hideHighlightInfo() {
             document.getElementById('highlight-info').style.display = 'none';
-        }}
+        }
 
-        function initTooltips() {{
+        function initTooltips() {
             const tooltip = document.getElementById('tooltip');
             const svg = document.getElementById('diagram-svg');
             let tooltipTarget = null;
 
             // Use event delegation on SVG for tooltip support on dynamic elements
-            svg.addEventListener('mouseover', (e) => {{
+            svg.addEventListener('mouseover', (e) => {
                 const service = e.target.closest('.service');
-                if (service && service !== tooltipTarget) {{
+                if (service && service !== tooltipTarget) {
                     tooltipTarget = service;
                     if (service.classList.contains('dragging')) return;
                     const data = service.dataset.tooltip;
-                    if (data) {{
+                    if (data) {
                         tooltip.textContent = data;
                         tooltip.style.display = 'block';
-                    }}
-                }}
-            }});
-            svg.addEventListener('mousemove', (e) => {{
-                if (tooltipTarget && !tooltipTarget.classList.contains('dragging')) {{
+                    }
+                }
+            });
+            svg.addEventListener('mousemove', (e) => {
+                if (tooltipTarget && !tooltipTarget.classList.contains('dragging')) {
                     tooltip.style.left = e.clientX + 15 + 'px';
                     tooltip.style.top = e.clientY + 15 + 'px';
-                }}
-            }});
-            svg.addEventListener('mouseout', (e) => {{
+                }
+            });
+            svg.addEventListener('mouseout', (e) => {
                 const service = e.target.closest('.service');
-                if (service && service === tooltipTarget) {{
+                if (service && service === tooltipTarget) {
                     // Check if we're leaving to a child element (not really leaving)
                     const related = e.relatedTarget;
                     if (related && service.contains(related)) return;
                     tooltipTarget = null;
                     tooltip.style.display = 'none';
-                }}
-            }});
-        }}
-
-        var resetPositions = function() {{
-            Object.keys(originalPositions).forEach(id => {{
-                servicePositions[id] = {{ ...originalPositions[id] }};
-                const el = document.querySelector(`[data-service-id="${{id}}"]`);
-                if (el) {{
-                    el.setAttribute('transform', `translate(${{originalPositions[id].x}}, ${{originalPositions[id].y}})`);
-                }}
-            }});
+                }
+            });
+        }
+
+        var resetPositions = function() {
+            Object.keys(originalPositions).forEach(id => {
+                setServicePosition(id, originalPositions[id].x, originalPositions[id].y);
+                const el = serviceEls.get(id);
+                if (el) {
+                    el.setAttribute('transform', `translate(${originalPositions[id].x}, ${originalPositions[id].y})`);
+                }
+            });
             updateAllConnections();
-        }};
-
-        var savePositions = function() {{
-            const data = JSON.stringify(servicePositions);
-            localStorage.setItem('diagramPositions', data);
-            alert('Layout saved to browser storage!');
-        }};
-
-        var loadPositions = function() {{
-            const data = localStorage.getItem('diagramPositions');
-            if (!data) {{
-                alert('No saved layout found.');
+        };
+
+        var savePositions = async function() {
+            await storeLayout(servicePositions);
+            showToast('Layout saved to browser storage!');
+        };
+
+        var loadPositions = async function() {
+            const saved = await fetchLayout();
+            if (!saved) {
+                showToast('No saved layout found.');
                 return;
-            }}
-
-            const saved = JSON.parse(data);
-            Object.keys(saved).forEach(id => {{
-                if (servicePositions[id]) {{
-                    servicePositions[id] = saved[id];
-                    const el = document.querySelector(`[data-service-id="${{id}}"]`);
-                    if (el) {{
-                        el.setAttribute('transform', `translate(${{saved[id].x}}, ${{saved[id].y}})`);
-                    }}
-                }}
-            }});
+            }
+
+            Object.keys(saved).forEach(id => {
+                if (servicePositions[id]) {
+                    setServicePosition(id, saved[id].x, saved[id].y);
+                    const el = serviceEls.get(id);
+                    if (el) {
+                        el.setAttribute('transform', `translate(${saved[id].x}, ${saved[id].y})`);
+                    }
+                }
+            });
             updateAllConnections();
-            alert('Layout loaded!');
-        }};
+            showToast('Layout loaded!');
+        };
+
+        // ============ LAYOUT STORAGE ============
+        // Positions go to IndexedDB (structured clone, asynchronous write) and fall back to
+        // localStorage when IndexedDB is unavailable, e.g. in some file:// contexts.
+        const LAYOUT_DB_NAME = 'terraformgraph';
+        const LAYOUT_STORE = 'layouts';
+        const LAYOUT_KEY = 'diagramPositions';
+        let layoutDbPromise = null;
+
+        function openLayoutDb() {
+            if (!layoutDbPromise) {
+                layoutDbPromise = new Promise((resolve, reject) => {
+                    if (!window.indexedDB) {
+                        reject(new Error('IndexedDB unavailable'));
+                        return;
+                    }
+                    const req = indexedDB.open(LAYOUT_DB_NAME, 1);
+                    req.onupgradeneeded = () => req.result.createObjectStore(LAYOUT_STORE);
+                    req.onsuccess = () => resolve(req.result);
+                    req.onerror = () => reject(req.error);
+                });
+            }
+            return layoutDbPromise;
+        }
+
+        async function storeLayout(positions) {
+            try {
+                const db = await openLayoutDb();
+                await new Promise((resolve, reject) => {
+                    const tx = db.transaction(LAYOUT_STORE, 'readwrite');
+                    tx.objectStore(LAYOUT_STORE).put(positions, LAYOUT_KEY);
+                    tx.oncomplete = resolve;
+                    tx.onerror = () => reject(tx.error);
+                });
+                // Drop any copy written by the localStorage fallback so it cannot go stale
+                localStorage.removeItem(LAYOUT_KEY);
+            } catch (e) {
+                localStorage.setItem(LAYOUT_KEY, JSON.stringify(positions));
+            }
+        }
 
-        function exportAs(format) {{
+        async function fetchLayout() {
+            try {
+                const db = await openLayoutDb();
+                const saved = await new Promise((resolve, reject) => {
+                    const req = db.transaction(LAYOUT_STORE).objectStore(LAYOUT_STORE).get(LAYOUT_KEY);
+                    req.onsuccess = () => resolve(req.result);
+                    req.onerror = () => reject(req.error);
+                });
+                if (saved) return saved;
+            } catch (e) {}
+            // Fallback storage, also covers layouts saved by earlier versions
+            const data = localStorage.getItem(LAYOUT_KEY);
+            if (!data) return null;
+            try { return JSON.parse(data); } catch (e) { return null; }
+        }
+
+        let toastTimer = null;
+        function showToast(message) {
+            const toast = document.getElementById('toast');
+            toast.textContent = message;
+            toast.style.display = 'block';
+            clearTimeout(toastTimer);
+            toastTimer = setTimeout(() => { toast.style.display = 'none'; }, 2500);
+        }
+
+        // Export canvas, context and image are created once and reused by every export
+        const exportCanvas = document.getElementById('export-canvas');
+        const exportCtx = exportCanvas.getContext('2d');
+        const exportImage = new Image();
+        // Bumped by each export; only the latest export may use or release exportImage
+        let exportToken = 0;
+        // Lossy formats are encoded with a configurable quality; PNG ignores the argument
+        const EXPORT_FORMATS = {
+            png: { mime: 'image/png', quality: undefined },
+            jpg: { mime: 'image/jpeg', quality: %%EXPORT_QUALITY%% },
+            webp: { mime: 'image/webp', quality: %%EXPORT_QUALITY%% },
+        };
+
+        // Object URL of the last exported image, revoked when replaced or the modal closes
+        let lastExportUrl = null;
+
+        function revokeExportUrl() {
+            if (lastExportUrl) {
+                URL.revokeObjectURL(lastExportUrl);
+                lastExportUrl = null;
+            }
+        }
+
+        // PNG/JPEG/WebP encoding runs in a worker on an OffscreenCanvas when supported.
+        // SVG decoding needs the DOM, so the main thread rasterizes to an ImageBitmap and
+        // transfers it; the worker only paints and encodes.
+        const EXPORT_WORKER_SRC = `
+            self.onmessage = async (e) => {
+                const { id, bitmap, width, height, mime, quality } = e.data;
+                try {
+                    const canvas = new OffscreenCanvas(width, height);
+                    const ctx = canvas.getContext('2d');
+                    ctx.fillStyle = 'white';
+                    ctx.fillRect(0, 0, width, height);
+                    ctx.drawImage(bitmap, 0, 0, width, height);
+                    bitmap.close();
+                    self.postMessage({ id, blob: await canvas.convertToBlob({ type: mime, quality }) });
+                } catch (err) {
+                    self.postMessage({ id, error: err.message });
+                }
+            };
+        `;
+        // A worker that never answers is given up on after this long
+        const EXPORT_WORKER_TIMEOUT_MS = 15000;
+        let exportWorker = null;  // null = not created yet, false = unavailable
+        // Requests in flight on the worker: id -> { resolve, reject, timer }
+        const exportRequests = new Map();
+        let nextExportRequestId = 0;
+
+        function settleExportRequest(id, error, blob) {
+            const request = exportRequests.get(id);
+            if (!request) return;
+            exportRequests.delete(id);
+            clearTimeout(request.timer);
+            if (error) request.reject(error);
+            else request.resolve(blob);
+        }
+
+        function disableExportWorker(reason) {
+            // Fail every pending request so each export falls back to the main thread
+            const worker = exportWorker;
+            exportWorker = false;
+            if (worker) worker.terminate();
+            for (const id of Array.from(exportRequests.keys())) {
+                settleExportRequest(id, new Error(reason));
+            }
+        }
+
+        function getExportWorker() {
+            if (exportWorker === null) {
+                exportWorker = false;
+                if (window.Worker && typeof OffscreenCanvas !== 'undefined' && window.createImageBitmap) {
+                    try {
+                        const src = URL.createObjectURL(new Blob([EXPORT_WORKER_SRC], { type: 'application/javascript' }));
+                        const worker = new Worker(src);
+                        URL.revokeObjectURL(src);
+                        worker.addEventListener('message', (e) => {
+                            const { id, blob, error } = e.data;
+                            settleExportRequest(id, blob ? null : new Error(error), blob);
+                        });
+                        // Load failures and worker crashes never post a message
+                        worker.addEventListener('error', (e) => {
+                            e.preventDefault();
+                            disableExportWorker('export worker failed');
+                        });
+                        worker.addEventListener('messageerror', () => {
+                            disableExportWorker('export worker message could not be read');
+                        });
+                        exportWorker = worker;
+                    } catch (e) {
+                        // Some file:// contexts refuse blob workers; encode on the main thread
+                    }
+                }
+            }
+            return exportWorker;
+        }
+
+        function encodeInWorker(worker, bitmap, width, height, mime, quality) {
+            return new Promise((resolve, reject) => {
+                const id = nextExportRequestId++;
+                const timer = setTimeout(() => {
+                    disableExportWorker('export worker timed out');
+                }, EXPORT_WORKER_TIMEOUT_MS);
+                exportRequests.set(id, { resolve, reject, timer });
+                worker.postMessage({ id, bitmap, width, height, mime, quality }, [bitmap]);
+            });
+        }
+
+        async function encodeExportImage(img, width, height, mime, quality) {
+            const worker = getExportWorker();
+            if (worker) {
+                try {
+                    const bitmap = await createImageBitmap(img);
+                    return await encodeInWorker(worker, bitmap, width, height, mime, quality);
+                } catch (err) {
+                    // Fall through to main-thread encoding
+                    if (exportWorker === worker) disableExportWorker(err.message);
+                }
+            }
+
+            exportCanvas.width = width;
+            exportCanvas.height = height;
+            exportCtx.clearRect(0, 0, width, height);
+            exportCtx.fillStyle = 'white';
+            exportCtx.fillRect(0, 0, width, height);
+            exportCtx.drawImage(img, 0, 0, width, height);
+            return new Promise((resolve, reject) => {
+                exportCanvas.toBlob((blob) => {
+                    if (blob) resolve(blob);
+                    else reject(new Error('the image could not be encoded.'));
+                }, mime, quality);
+            });
+        }
+
+        function exportAs(format) {
             const svg = document.getElementById('diagram-svg');
-            const canvas = document.getElementById('export-canvas');
-            const ctx = canvas.getContext('2d');
 
             const vbW = svg.viewBox.baseVal.width;
             const vbH = svg.viewBox.baseVal.height;
             const scale = 2; // Higher resolution
-            canvas.width = vbW * scale;
-            canvas.height = vbH * scale;
+            const width = vbW * scale;
+            const height = vbH * scale;
 
             // Clone SVG so we can modify attributes for standalone rendering
             const svgClone = svg.cloneNode(true);
-            // Set explicit pixel dimensions (width="100%" won't resolve in a blob image)
-            svgClone.setAttribute('width', vbW);
-            svgClone.setAttribute('height', vbH);
+            // Set explicit pixel dimensions at the export resolution (width="100%" won't
+            // resolve in a standalone image, and a full-size bitmap keeps the output sharp)
+            svgClone.setAttribute('width', width);
+            svgClone.setAttribute('height', height);
             svgClone.removeAttribute('style');
+            // The connection canvas cannot be serialized; the SVG paths are exported instead
+            const canvasHost = svgClone.querySelector('#conn-canvas-host');
+            if (canvasHost) canvasHost.remove();
 
             // Embed essential CSS inside the SVG for standalone rendering
             const styleEl = document.createElementNS('http://www.w3.org/2000/svg', 'style');
             styleEl.textContent = `
-                .agg-hidden {{ display: none !important; }}
-                .conn-type-hidden {{ display: none !important; }}
+                .agg-hidden { display: none !important; }
+                .conn-type-hidden { display: none !important; }
             `;
             svgClone.insertBefore(styleEl, svgClone.firstChild);
 
@@ -1800,67 +1527,86 @@ class HTMLRenderer:
             const svgBase64 = btoa(unescape(encodeURIComponent(svgData)));
             const dataUri = 'data:image/svg+xml;base64,' + svgBase64;
 
-            const img = new Image();
-            img.onload = () => {{
-                ctx.fillStyle = 'white';
-                ctx.fillRect(0, 0, canvas.width, canvas.height);
-
-                ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
-
-                try {{
-                    const mimeType = format === 'jpg' ? 'image/jpeg' : 'image/png';
-                    const quality = format === 'jpg' ? 0.95 : undefined;
-                    const dataUrl = canvas.toDataURL(mimeType, quality);
+            const img = exportImage;
+            // A newer export takes over the shared image; this one then finishes silently
+            const token = ++exportToken;
+            const isCurrent = () => token === exportToken;
+            const releaseImage = () => {
+                if (!isCurrent()) return;
+                // Drop the handlers and source so the previous SVG data URI can be collected
+                img.onload = null;
+                img.onerror = null;
+                img.removeAttribute('src');
+            };
+            img.onload = () => {
+                const { mime, quality } = EXPORT_FORMATS[format] || EXPORT_FORMATS.png;
+                // Encode to a Blob (no base64 string) and hand it out via an object URL
+                encodeExportImage(img, width, height, mime, quality).then((blob) => {
+                    if (!isCurrent()) return;
+                    releaseImage();
+                    // Browsers without an encoder for the format fall back to PNG
+                    if (blob.type !== mime) format = 'png';
+
+                    revokeExportUrl();
+                    lastExportUrl = URL.createObjectURL(blob);
 
                     const preview = document.getElementById('export-preview');
                     const download = document.getElementById('export-download');
 
-                    preview.src = dataUrl;
-                    download.href = dataUrl;
-                    download.download = `aws-diagram.${{format}}`;
+                    preview.src = lastExportUrl;
+                    download.href = lastExportUrl;
+                    download.download = `aws-diagram.${format}`;
 
                     document.getElementById('export-modal').classList.add('active');
-                }} catch (err) {{
+                }).catch((err) => {
+                    if (!isCurrent()) return;
+                    releaseImage();
                     alert('Export failed: ' + err.message);
-                }}
-            }};
-            img.onerror = () => {{
+                });
+            };
+            img.onerror = () => {
+                if (!isCurrent()) return;
+                releaseImage();
                 alert('Failed to render SVG for export.');
-            }};
+            };
             img.src = dataUri;
-        }}
+        }
 
-        function closeExportModal() {{
+        function closeExportModal() {
             document.getElementById('export-modal').classList.remove('active');
-        }}
+            // Release the encoded image held by the preview and the download link
+            document.getElementById('export-preview').removeAttribute('src');
+            document.getElementById('export-download').removeAttribute('href');
+            revokeExportUrl();
+        }
 
         // Close modal on background click
-        document.getElementById('export-modal').addEventListener('click', (e) => {{
-            if (e.target.id === 'export-modal') {{
+        document.getElementById('export-modal').addEventListener('click', (e) => {
+            if (e.target.id === 'export-modal') {
                 closeExportModal();
-            }}
-        }});
+            }
+        });
 
         // ============ AGGREGATION SYSTEM ============
-        const aggregationState = {{}};       // {{ serviceType: bool }} true=aggregated
+        const aggregationState = {};       // { serviceType: bool } true=aggregated
         const originalConnections = [];      // snapshot of all original connections
-        const aggregateNodes = {{}};          // {{ serviceType: SVGGElement }}
-        const aggregateConnections = {{}};    // {{ serviceType: [SVGGElement...] }}
+        const aggregateNodes = {};          // { serviceType: SVGGElement }
+        const aggregateConnections = {};    // { serviceType: [SVGGElement...] }
         let activePopover = null;
         let selectedPopoverResource = null;
 
-        // Connection type filter state: {{ connType: bool }} true=visible
+        // Connection type filter state: { connType: bool } true=visible
         const CONNECTION_TYPES = [
-            {{ id: 'data_flow', label: 'Data Flow', color: '#3B48CC' }},
-            {{ id: 'trigger', label: 'Event Trigger', color: '#E7157B' }},
-            {{ id: 'encrypt', label: 'Encryption', color: '#6c757d' }},
-            {{ id: 'network_flow', label: 'Network Flow', color: '#0d7c3f' }},
-            {{ id: 'security_rule', label: 'Security Rule', color: '#d97706' }},
-            {{ id: 'default', label: 'Reference', color: '#999999' }}
+            { id: 'data_flow', label: 'Data Flow', color: '#3B48CC' },
+            { id: 'trigger', label: 'Event Trigger', color: '#E7157B' },
+            { id: 'encrypt', label: 'Encryption', color: '#6c757d' },
+            { id: 'network_flow', label: 'Network Flow', color: '#0d7c3f' },
+            { id: 'security_rule', label: 'Security Rule', color: '#d97706' },
+            { id: 'default', label: 'Reference', color: '#999999' }
         ];
-        const connTypeFilterState = {{}};
+        const connTypeFilterState = {};
 
-        function initAggregation() {{
+        function initAggregation() {
             if (!AGGREGATION_CONFIG || !AGGREGATION_CONFIG.groups) return;
 
             // Check if any group qualifies for aggregation
@@ -1874,34 +1620,34 @@ class HTMLRenderer:
             // Load saved state from localStorage or use defaults
             const savedState = localStorage.getItem('diagramAggregationState');
             let loaded = null;
-            if (savedState) {{
-                try {{ loaded = JSON.parse(savedState); }} catch(e) {{}}
-            }}
+            if (savedState) {
+                try { loaded = JSON.parse(savedState); } catch(e) {}
+            }
 
-            for (const [stype, group] of Object.entries(AGGREGATION_CONFIG.groups)) {{
-                if (group.count >= AGGREGATION_CONFIG.threshold) {{
+            for (const [stype, group] of Object.entries(AGGREGATION_CONFIG.groups)) {
+                if (group.count >= AGGREGATION_CONFIG.threshold) {
                     aggregationState[stype] = loaded ? !!loaded[stype] : group.defaultAggregated;
-                }}
-            }}
+                }
+            }
 
             // Render chip panel
             renderChipPanel();
 
             // Apply initial aggregation (skip per-group connection recalc)
-            for (const [stype, isAgg] of Object.entries(aggregationState)) {{
-                if (isAgg) {{
+            for (const [stype, isAgg] of Object.entries(aggregationState)) {
+                if (isAgg) {
                     aggregateGroup(stype, true);
-                }}
-            }}
+                }
+            }
 
             // Recalculate all connections once, considering all aggregated groups
             recalculateAllAggregateConnections();
-        }}
+        }
 
-        function snapshotConnections() {{
+        function snapshotConnections() {
             originalConnections.length = 0;
-            document.querySelectorAll('.connection').forEach(conn => {{
-                originalConnections.push({{
+            document.querySelectorAll('.connection').forEach(conn => {
+                originalConnections.push({
                     element: conn,
                     sourceId: conn.dataset.source,
                     targetId: conn.dataset.target,
@@ -1909,40 +1655,62 @@ class HTMLRenderer:
                     targetType: conn.dataset.targetType || '',
                     label: conn.dataset.label || '',
                     connType: conn.dataset.connType || 'default',
-                }});
-            }});
-        }}
+                });
+            });
+        }
 
-        function getServiceNodesForType(serviceType) {{
-            return Array.from(document.querySelectorAll(`.service[data-service-type="${{serviceType}}"]`))
+        // Parsed icon per aggregation group: the iconHtml string is parsed on first use
+        // and cloned afterwards instead of being re-parsed for every node and popover item
+        const groupIconTemplates = {};
+
+        function getGroupIcon(serviceType, size) {
+            const group = AGGREGATION_CONFIG.groups[serviceType];
+            if (!group || !group.iconHtml) return null;
+
+            let template = groupIconTemplates[serviceType];
+            if (template === undefined) {
+                const div = document.createElement('div');
+                div.innerHTML = group.iconHtml;
+                template = groupIconTemplates[serviceType] = div.querySelector('svg');
+            }
+            if (!template) return null;
+
+            const icon = template.cloneNode(true);
+            icon.setAttribute('width', `${size}`);
+            icon.setAttribute('height', `${size}`);
+            return icon;
+        }
+
+        function getServiceNodesForType(serviceType) {
+            return Array.from(document.querySelectorAll(`.service[data-service-type="${serviceType}"]`))
                 .filter(el => !el.classList.contains('aggregate-node'));
-        }}
+        }
 
-        function computeCentroid(serviceType) {{
+        function computeCentroid(serviceType) {
             const group = AGGREGATION_CONFIG.groups[serviceType];
-            if (!group) return {{ x: 0, y: 0 }};
+            if (!group) return { x: 0, y: 0 };
             let sumX = 0, sumY = 0, count = 0;
-            for (const sid of group.serviceIds) {{
+            for (const sid of group.serviceIds) {
                 const pos = servicePositions[sid];
-                if (pos) {{
+                if (pos) {
                     sumX += pos.x;
                     sumY += pos.y;
                     count++;
-                }}
-            }}
-            if (count === 0) return {{ x: 100, y: 100 }};
-            return {{ x: sumX / count, y: sumY / count }};
-        }}
+                }
+            }
+            if (count === 0) return { x: 100, y: 100 };
+            return { x: sumX / count, y: sumY / count };
+        }
 
-        function aggregateGroup(serviceType, skipConnectionRecalc) {{
+        function aggregateGroup(serviceType, skipConnectionRecalc) {
             const group = AGGREGATION_CONFIG.groups[serviceType];
             if (!group) return;
 
             // Hide individual nodes
-            for (const sid of group.serviceIds) {{
-                const el = document.querySelector(`[data-service-id="${{sid}}"]`);
+            for (const sid of group.serviceIds) {
+                const el = serviceEls.get(sid);
                 if (el) el.classList.add('agg-hidden');
-            }}
+            }
 
             // Calculate centroid
             const centroid = computeCentroid(serviceType);
@@ -1953,13 +1721,13 @@ class HTMLRenderer:
 
             const aggG = document.createElementNS('http://www.w3.org/2000/svg', 'g');
             aggG.classList.add('service', 'draggable', 'aggregate-node');
-            aggG.dataset.serviceId = `__agg_${{serviceType}}`;
+            aggG.dataset.serviceId = `__agg_${serviceType}`;
             aggG.dataset.serviceType = serviceType;
-            aggG.dataset.tooltip = `${{group.label}} (${{group.count}} resources - click to inspect)`;
+            aggG.dataset.tooltip = `${group.label} (${group.count} resources - click to inspect)`;
             // Inherit VPC status from the first service in the group
-            const firstNode = document.querySelector(`[data-service-id="${{group.serviceIds[0]}}"]`);
+            const firstNode = serviceEls.get(group.serviceIds[0]);
             aggG.dataset.isVpc = (firstNode && firstNode.dataset.isVpc === 'true') ? 'true' : 'false';
-            aggG.setAttribute('transform', `translate(${{centroid.x}}, ${{centroid.y}})`);
+            aggG.setAttribute('transform', `translate(${centroid.x}, ${centroid.y})`);
             aggG.style.cursor = 'pointer';
 
             // Background rect (dashed border)
@@ -1967,8 +1735,8 @@ class HTMLRenderer:
             bgRect.classList.add('service-bg');
             bgRect.setAttribute('x', '-8');
             bgRect.setAttribute('y', '-8');
-            bgRect.setAttribute('width', `${{iconSize + 16}}`);
-            bgRect.setAttribute('height', `${{iconSize + 36}}`);
+            bgRect.setAttribute('width', `${iconSize + 16}`);
+            bgRect.setAttribute('height', `${iconSize + 36}`);
             bgRect.setAttribute('fill', 'white');
             bgRect.setAttribute('stroke', group.color || '#999');
             bgRect.setAttribute('stroke-width', '2');
@@ -1979,42 +1747,38 @@ class HTMLRenderer:
             aggG.appendChild(bgRect);
 
             // Icon
-            if (group.iconHtml) {{
+            if (group.iconHtml) {
                 const foreignObj = document.createElementNS('http://www.w3.org/2000/svg', 'foreignObject');
                 foreignObj.setAttribute('x', '0');
                 foreignObj.setAttribute('y', '0');
-                foreignObj.setAttribute('width', `${{iconSize}}`);
-                foreignObj.setAttribute('height', `${{iconSize}}`);
+                foreignObj.setAttribute('width', `${iconSize}`);
+                foreignObj.setAttribute('height', `${iconSize}`);
                 const div = document.createElement('div');
-                div.innerHTML = group.iconHtml;
-                div.style.width = `${{iconSize}}px`;
-                div.style.height = `${{iconSize}}px`;
-                const innerSvg = div.querySelector('svg');
-                if (innerSvg) {{
-                    innerSvg.setAttribute('width', `${{iconSize}}`);
-                    innerSvg.setAttribute('height', `${{iconSize}}`);
-                }}
+                div.style.width = `${iconSize}px`;
+                div.style.height = `${iconSize}px`;
+                const innerSvg = getGroupIcon(serviceType, iconSize);
+                if (innerSvg) div.appendChild(innerSvg);
                 foreignObj.appendChild(div);
                 aggG.appendChild(foreignObj);
-            }}
+            }
 
             // Label
             const label = document.createElementNS('http://www.w3.org/2000/svg', 'text');
             label.classList.add('service-label');
-            label.setAttribute('x', `${{iconSize / 2}}`);
-            label.setAttribute('y', `${{iconSize + 16}}`);
+            label.setAttribute('x', `${iconSize / 2}`);
+            label.setAttribute('y', `${iconSize + 16}`);
             label.setAttribute('font-family', 'Arial, sans-serif');
             label.setAttribute('font-size', '12');
             label.setAttribute('fill', '#333');
             label.setAttribute('text-anchor', 'middle');
             label.setAttribute('font-weight', '500');
-            label.textContent = `${{group.label}} (${{group.count}})`;
+            label.textContent = `${group.label} (${group.count})`;
             aggG.appendChild(label);
 
             // Count badge
             const badgeCircle = document.createElementNS('http://www.w3.org/2000/svg', 'circle');
             badgeCircle.classList.add('aggregate-badge');
-            badgeCircle.setAttribute('cx', `${{iconSize + 8 - 8}}`);
+            badgeCircle.setAttribute('cx', `${iconSize + 8 - 8}`);
             badgeCircle.setAttribute('cy', '8');
             badgeCircle.setAttribute('r', '12');
             badgeCircle.setAttribute('fill', group.color || '#ff9900');
@@ -2024,7 +1788,7 @@ class HTMLRenderer:
 
             const badgeText = document.createElementNS('http://www.w3.org/2000/svg', 'text');
             badgeText.classList.add('aggregate-badge');
-            badgeText.setAttribute('x', `${{iconSize + 8 - 8}}`);
+            badgeText.setAttribute('x', `${iconSize + 8 - 8}`);
             badgeText.setAttribute('y', '12');
             badgeText.setAttribute('font-family', 'Arial, sans-serif');
             badgeText.setAttribute('font-size', '11');
@@ -2036,148 +1800,145 @@ class HTMLRenderer:
 
             servicesLayer.appendChild(aggG);
             aggregateNodes[serviceType] = aggG;
+            serviceEls.set(aggG.dataset.serviceId, aggG);
 
             // Register position
-            servicePositions[`__agg_${{serviceType}}`] = {{ x: centroid.x, y: centroid.y }};
+            setServicePosition(`__agg_${serviceType}`, centroid.x, centroid.y);
 
-            // Setup drag for aggregate node
-            aggG.addEventListener('mousedown', (e) => {{
-                // Drag is handled by the existing drag system since we add .draggable class
-                // But we also need click for popover — distinguish via a moved flag
-            }});
-
-            // Setup click for popover (using mouseup without movement)
+            // Drag is handled by the existing drag system since we add .draggable class,
+            // but we also need click for popover (pointerup without movement). Pointer events
+            // are used because the drag's preventDefault suppresses compatibility mouse events.
             let aggDragStartPos = null;
-            aggG.addEventListener('mousedown', (e) => {{
-                aggDragStartPos = {{ x: e.clientX, y: e.clientY }};
-            }});
-            aggG.addEventListener('mouseup', (e) => {{
-                if (aggDragStartPos) {{
+            aggG.addEventListener('pointerdown', (e) => {
+                aggDragStartPos = { x: e.clientX, y: e.clientY };
+            });
+            aggG.addEventListener('pointerup', (e) => {
+                if (aggDragStartPos) {
                     const dx = Math.abs(e.clientX - aggDragStartPos.x);
                     const dy = Math.abs(e.clientY - aggDragStartPos.y);
-                    if (dx < 5 && dy < 5) {{
+                    if (dx < 5 && dy < 5) {
                         // This was a click, not a drag — show popover
-                        // Do NOT stopPropagation: SVG mouseup must fire to clear drag state
                         showAggregatePopover(serviceType, e.clientX, e.clientY);
-                    }}
-                }}
+                    }
+                }
                 aggDragStartPos = null;
-            }});
+            });
 
             // Re-route all connections (considers all aggregated groups)
-            if (!skipConnectionRecalc) {{
+            if (!skipConnectionRecalc) {
                 recalculateAllAggregateConnections();
-            }}
-        }}
+            }
+        }
 
-        function deaggregateGroup(serviceType) {{
+        function deaggregateGroup(serviceType) {
             const group = AGGREGATION_CONFIG.groups[serviceType];
             if (!group) return;
 
             // Close popover if open for this group
-            if (activePopover) {{
+            if (activePopover) {
                 closeAggregatePopover();
-            }}
+            }
 
             // Show individual nodes
-            for (const sid of group.serviceIds) {{
-                const el = document.querySelector(`[data-service-id="${{sid}}"]`);
+            for (const sid of group.serviceIds) {
+                const el = serviceEls.get(sid);
                 if (el) el.classList.remove('agg-hidden');
-            }}
+            }
 
             // Remove aggregate node
-            if (aggregateNodes[serviceType]) {{
+            if (aggregateNodes[serviceType]) {
                 aggregateNodes[serviceType].remove();
+                serviceEls.delete(aggregateNodes[serviceType].dataset.serviceId);
                 delete aggregateNodes[serviceType];
-                delete servicePositions[`__agg_${{serviceType}}`];
-            }}
+                delete servicePositions[`__agg_${serviceType}`];
+            }
 
             // Recalculate all connections (considers remaining aggregated groups)
             recalculateAllAggregateConnections();
-        }}
+        }
 
         // ============ CONNECTION RE-ROUTING ============
         // Single function that recalculates ALL aggregate connections
         // considering ALL currently aggregated groups at once.
         // This avoids cross-group issues where group A's aggregate connections
         // point to individual nodes of group B that are now hidden.
-        function recalculateAllAggregateConnections() {{
+        function recalculateAllAggregateConnections() {
             // 1. Remove ALL existing aggregate connections
-            for (const [stype, conns] of Object.entries(aggregateConnections)) {{
+            for (const [stype, conns] of Object.entries(aggregateConnections)) {
                 conns.forEach(c => c.remove());
-            }}
+            }
             for (const k of Object.keys(aggregateConnections)) delete aggregateConnections[k];
 
             // 2. Reset hidden state on ALL original connections
-            for (const conn of originalConnections) {{
+            for (const conn of originalConnections) {
                 conn.element.classList.remove('agg-hidden');
-            }}
+            }
 
             // 3. Build a map: serviceId -> aggregated group type (or null)
-            const idToAggGroup = {{}};
-            for (const [stype, isAgg] of Object.entries(aggregationState)) {{
+            const idToAggGroup = {};
+            for (const [stype, isAgg] of Object.entries(aggregationState)) {
                 if (!isAgg) continue;
                 const group = AGGREGATION_CONFIG.groups[stype];
                 if (!group) continue;
-                for (const sid of group.serviceIds) {{
+                for (const sid of group.serviceIds) {
                     idToAggGroup[sid] = stype;
-                }}
-            }}
+                }
+            }
 
             // 4. Process each original connection: hide and build merged map
             // Key for merged map: "resolvedSource|resolvedTarget|connType"
             // where resolvedSource/Target is either the original ID or __agg_<type>
-            const mergedMap = {{}};
+            const mergedMap = {};
 
-            for (const conn of originalConnections) {{
+            for (const conn of originalConnections) {
                 const srcGroup = idToAggGroup[conn.sourceId] || null;
                 const tgtGroup = idToAggGroup[conn.targetId] || null;
 
-                if (!srcGroup && !tgtGroup) {{
+                if (!srcGroup && !tgtGroup) {
                     // Neither endpoint is aggregated: leave visible
                     continue;
-                }}
+                }
 
                 // At least one endpoint is aggregated: hide original
                 conn.element.classList.add('agg-hidden');
 
-                if (srcGroup && tgtGroup && srcGroup === tgtGroup) {{
+                if (srcGroup && tgtGroup && srcGroup === tgtGroup) {
                     // Both in same group: hide entirely, no aggregate connection
                     continue;
-                }}
+                }
 
                 // Resolve endpoints: use aggregate node ID if in an aggregated group
-                const resolvedSource = srcGroup ? `__agg_${{srcGroup}}` : conn.sourceId;
-                const resolvedTarget = tgtGroup ? `__agg_${{tgtGroup}}` : conn.targetId;
+                const resolvedSource = srcGroup ? `__agg_${srcGroup}` : conn.sourceId;
+                const resolvedTarget = tgtGroup ? `__agg_${tgtGroup}` : conn.targetId;
 
-                const key = `${{resolvedSource}}|${{resolvedTarget}}|${{conn.connType}}`;
-                if (!mergedMap[key]) {{
-                    mergedMap[key] = {{
+                const key = `${resolvedSource}|${resolvedTarget}|${conn.connType}`;
+                if (!mergedMap[key]) {
+                    mergedMap[key] = {
                         sourceId: resolvedSource,
                         targetId: resolvedTarget,
                         connType: conn.connType,
                         label: conn.label,
                         count: 0,
-                    }};
-                }}
+                    };
+                }
                 mergedMap[key].count++;
-            }}
+            }
 
             // 5. Create aggregate connections from merged map
             const connLayer = document.getElementById('connections-layer');
-            const styles = {{
-                'data_flow': {{ color: '#3B48CC', dash: '', marker: 'url(#arrowhead-data)' }},
-                'trigger': {{ color: '#E7157B', dash: '', marker: 'url(#arrowhead-trigger)' }},
-                'encrypt': {{ color: '#6c757d', dash: '4,4', marker: 'url(#arrowhead)' }},
-                'network_flow': {{ color: '#0d7c3f', dash: '', marker: 'url(#arrowhead-network)' }},
-                'security_rule': {{ color: '#d97706', dash: '2,4', marker: 'url(#arrowhead-security)' }},
-                'default': {{ color: '#999999', dash: '', marker: 'url(#arrowhead)' }},
-            }};
+            const styles = {
+                'data_flow': { color: '#3B48CC', dash: '', marker: 'url(#arrowhead-data)' },
+                'trigger': { color: '#E7157B', dash: '', marker: 'url(#arrowhead-trigger)' },
+                'encrypt': { color: '#6c757d', dash: '4,4', marker: 'url(#arrowhead)' },
+                'network_flow': { color: '#0d7c3f', dash: '', marker: 'url(#arrowhead-network)' },
+                'security_rule': { color: '#d97706', dash: '2,4', marker: 'url(#arrowhead-security)' },
+                'default': { color: '#999999', dash: '', marker: 'url(#arrowhead)' },
+            };
 
             // Group aggregate connections by which agg group they belong to (for tracking)
-            const newAggConns = {{}};
+            const newAggConns = {};
 
-            for (const [key, info] of Object.entries(mergedMap)) {{
+            for (const [key, info] of Object.entries(mergedMap)) {
                 const style = styles[info.connType] || styles['default'];
 
                 const sourcePos = servicePositions[info.sourceId];
@@ -2210,26 +1971,26 @@ class HTMLRenderer:
                 pathEl.setAttribute('d', pathD);
                 pathEl.setAttribute('fill', 'none');
                 pathEl.setAttribute('stroke', style.color);
-                pathEl.setAttribute('stroke-width', `${{strokeWidth}}`);
+                pathEl.setAttribute('stroke-width', `${strokeWidth}`);
                 if (style.dash) pathEl.setAttribute('stroke-dasharray', style.dash);
                 pathEl.setAttribute('marker-end', style.marker);
                 pathEl.setAttribute('opacity', '0.7');
                 connG.appendChild(pathEl);
 
-                if (info.count > 1) {{
+                if (info.count > 1) {
                     const midX = (sourcePos.x + targetPos.x) / 2 + iconSize / 2;
                     const midY = (sourcePos.y + targetPos.y) / 2 + iconSize / 2;
                     const multLabel = document.createElementNS('http://www.w3.org/2000/svg', 'text');
                     multLabel.classList.add('multiplicity-label');
-                    multLabel.setAttribute('x', `${{midX + 8}}`);
-                    multLabel.setAttribute('y', `${{midY - 5}}`);
+                    multLabel.setAttribute('x', `${midX + 8}`);
+                    multLabel.setAttribute('y', `${midY - 5}`);
                     multLabel.setAttribute('font-family', 'Arial, sans-serif');
                     multLabel.setAttribute('font-size', '10');
                     multLabel.setAttribute('font-weight', 'bold');
                     multLabel.setAttribute('fill', style.color);
-                    multLabel.textContent = `x${{info.count}}`;
+                    multLabel.textContent = `x${info.count}`;
                     connG.appendChild(multLabel);
-                }}
+                }
 
                 connLayer.appendChild(connG);
 
@@ -2237,58 +1998,191 @@ class HTMLRenderer:
                 const involvedGroups = new Set();
                 if (info.sourceId.startsWith('__agg_')) involvedGroups.add(info.sourceId.replace('__agg_', ''));
                 if (info.targetId.startsWith('__agg_')) involvedGroups.add(info.targetId.replace('__agg_', ''));
-                for (const g of involvedGroups) {{
+                for (const g of involvedGroups) {
                     if (!newAggConns[g]) newAggConns[g] = [];
                     newAggConns[g].push(connG);
-                }}
-            }}
+                }
+            }
 
             // Update the global tracking object
-            for (const [g, conns] of Object.entries(newAggConns)) {{
+            for (const [g, conns] of Object.entries(newAggConns)) {
                 aggregateConnections[g] = conns;
-            }}
+            }
 
             // Re-apply connection type filter to new aggregate connections
             applyConnTypeFilter();
-        }}
+        }
+
+        function calcConnectionPath(sourcePos, targetPos) {
+            const [sx, sy, midX, midY, tx, ty] = calcConnectionPoints(sourcePos, targetPos);
+            // Quadratic curve path (matches server-side rendering); plain concatenation
+            // keeps this cheap since it runs for every affected connection on each drag frame
+            return 'M ' + sx + ' ' + sy + ' Q ' + midX + ' ' + sy + ', ' + midX + ' ' + midY + ' T ' + tx + ' ' + ty;
+        }
 
-        function calcConnectionPath(sourcePos, targetPos) {{
+        function calcConnectionPoints(sourcePos, targetPos) {
             const halfSize = iconSize / 2;
             let sx = sourcePos.x + halfSize;
             let sy = sourcePos.y + halfSize;
             let tx = targetPos.x + halfSize;
             let ty = targetPos.y + halfSize;
 
-            if (Math.abs(ty - sy) > Math.abs(tx - sx)) {{
-                if (ty > sy) {{
+            if (Math.abs(ty - sy) > Math.abs(tx - sx)) {
+                if (ty > sy) {
                     sy = sourcePos.y + iconSize + 8;
                     ty = targetPos.y - 8;
-                }} else {{
+                } else {
                     sy = sourcePos.y - 8;
                     ty = targetPos.y + iconSize + 8;
-                }}
-            }} else {{
-                if (tx > sx) {{
+                }
+            } else {
+                if (tx > sx) {
                     sx = sourcePos.x + iconSize + 8;
                     tx = targetPos.x - 8;
-                }} else {{
+                } else {
                     sx = sourcePos.x - 8;
                     tx = targetPos.x + iconSize + 8;
-                }}
-            }}
+                }
+            }
+
+            return [sx, sy, (sx + tx) / 2, (sy + ty) / 2, tx, ty];
+        }
+
+        // ============ CANVAS CONNECTIONS ============
+        // Large diagrams paint connection lines on a single canvas embedded in the SVG.
+        // The SVG connection elements remain for click hit-testing, highlighting and export.
+        const pendingConnectionPaths = new Set();
+        let connectionCanvasFrame = 0;
+
+        function initConnectionCanvas() {
+            if (!CANVAS_CONNECTIONS) return;
+            resizeConnectionCanvas();
+
+            // Repaint whenever visibility-affecting state changes (filters, aggregation,
+            // highlighting, popover dimming); redraws are coalesced into one frame
+            const observer = new MutationObserver(scheduleConnectionCanvasRedraw);
+            observer.observe(document.getElementById('connections-layer'), {
+                childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'style'],
+            });
+            observer.observe(document.getElementById('diagram-svg'), {
+                attributes: true, attributeFilter: ['data-highlight'],
+            });
+        }
+
+        function resizeConnectionCanvas() {
+            const svg = document.getElementById('diagram-svg');
+            const host = document.getElementById('conn-canvas-host');
+            const canvas = document.getElementById('conn-canvas');
+            if (!host || !canvas) return;
+
+            const vb = svg.viewBox.baseVal;
+            const ratio = Math.min(window.devicePixelRatio || 1, 2);
+            host.setAttribute('width', vb.width);
+            host.setAttribute('height', vb.height);
+            canvas.width = Math.round(vb.width * ratio);
+            canvas.height = Math.round(vb.height * ratio);
+            canvas.style.width = vb.width + 'px';
+            canvas.style.height = vb.height + 'px';
+            scheduleConnectionCanvasRedraw();
+        }
+
+        function scheduleConnectionCanvasRedraw() {
+            if (connectionCanvasFrame) return;
+            connectionCanvasFrame = requestAnimationFrame(() => {
+                connectionCanvasFrame = 0;
+                drawConnectionCanvas();
+                flushConnectionPaths();
+            });
+        }
+
+        function flushConnectionPaths() {
+            // While dragging only highlighted connections (drawn by SVG) need live paths
+            const dragActive = !!document.querySelector('.service.dragging');
+            for (const connEl of pendingConnectionPaths) {
+                if (dragActive && !connEl.classList.contains('highlighted')) continue;
+                writeConnectionPath(connEl);
+                pendingConnectionPaths.delete(connEl);
+            }
+        }
 
-            const midX = (sx + tx) / 2;
-            const midY = (sy + ty) / 2;
-            return `M ${{sx}} ${{sy}} Q ${{midX}} ${{sy}}, ${{midX}} ${{midY}} T ${{tx}} ${{ty}}`;
-        }}
+        function getConnectionCanvasStyle(connEl) {
+            if (!connEl._canvasStyle) {
+                const pathEl = connEl.querySelector('.connection-path');
+                const dash = pathEl ? pathEl.getAttribute('stroke-dasharray') : null;
+                connEl._canvasStyle = {
+                    color: pathEl ? pathEl.getAttribute('stroke') : '#999999',
+                    width: pathEl ? parseFloat(pathEl.getAttribute('stroke-width')) || 1.5 : 1.5,
+                    opacity: pathEl ? parseFloat(pathEl.getAttribute('opacity')) || 0.7 : 0.7,
+                    dash: dash ? dash.split(',').map(Number) : [],
+                };
+            }
+            return connEl._canvasStyle;
+        }
 
-        function getServiceTypeById(serviceId) {{
-            const el = document.querySelector(`[data-service-id="${{serviceId}}"]`);
+        function drawConnectionCanvas() {
+            const canvas = document.getElementById('conn-canvas');
+            if (!canvas) return;
+            const ctx = canvas.getContext('2d');
+            const vb = document.getElementById('diagram-svg').viewBox.baseVal;
+            const highlightActive = document.getElementById('diagram-svg').hasAttribute('data-highlight');
+
+            ctx.setTransform(1, 0, 0, 1, 0, 0);
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            ctx.setTransform(canvas.width / vb.width, 0, 0, canvas.height / vb.height, 0, 0);
+
+            document.getElementById('connections-layer').querySelectorAll('.connection').forEach(connEl => {
+                const cls = connEl.classList;
+                // Hidden connections are skipped; highlighted ones are drawn by the SVG itself
+                if (cls.contains('agg-hidden') || cls.contains('conn-type-hidden') || cls.contains('highlighted')) return;
+
+                const sourcePos = servicePositions[connEl.dataset.source];
+                const targetPos = servicePositions[connEl.dataset.target];
+                if (!sourcePos || !targetPos) return;
+
+                const [sx, sy, midX, midY, tx, ty] = calcConnectionPoints(sourcePos, targetPos);
+                const style = getConnectionCanvasStyle(connEl);
+                let alpha = style.opacity;
+                if (connEl.style.opacity) alpha *= parseFloat(connEl.style.opacity);
+                if (highlightActive) alpha *= 0.1;
+
+                ctx.globalAlpha = alpha;
+                ctx.strokeStyle = style.color;
+                ctx.fillStyle = style.color;
+                ctx.lineWidth = style.width;
+                ctx.setLineDash(style.dash);
+                ctx.beginPath();
+                ctx.moveTo(sx, sy);
+                ctx.quadraticCurveTo(midX, sy, midX, midY);
+                ctx.quadraticCurveTo(midX, ty, tx, ty);
+                ctx.stroke();
+
+                // Arrowhead along the end tangent (control point to end point)
+                let dx = tx - midX;
+                let dy = 0;
+                if (dx === 0) {
+                    dy = ty - midY;
+                }
+                const len = Math.hypot(dx, dy) || 1;
+                dx /= len;
+                dy /= len;
+                ctx.setLineDash([]);
+                ctx.beginPath();
+                ctx.moveTo(tx, ty);
+                ctx.lineTo(tx - dx * 10 - dy * 3.5, ty - dy * 10 + dx * 3.5);
+                ctx.lineTo(tx - dx * 10 + dy * 3.5, ty - dy * 10 - dx * 3.5);
+                ctx.closePath();
+                ctx.fill();
+            });
+            ctx.globalAlpha = 1;
+        }
+
+        function getServiceTypeById(serviceId) {
+            const el = serviceEls.get(serviceId);
             return el ? (el.dataset.serviceType || '') : '';
-        }}
+        }
 
         // ============ CHIP PANEL ============
-        function renderChipPanel() {{
+        function renderChipPanel() {
             const panel = document.getElementById('aggregation-panel');
             const chipsContainer = document.getElementById('aggregation-chips');
             if (!panel || !chipsContainer) return;
@@ -2301,109 +2195,113 @@ class HTMLRenderer:
             if (groups.length === 0) return;
 
             panel.style.display = 'flex';
-            chipsContainer.innerHTML = '';
 
-            for (const [stype, group] of groups) {{
-                const chip = document.createElement('div');
-                chip.classList.add('aggregation-chip');
+            const frag = document.createDocumentFragment();
+            for (const [stype, group] of groups) {
+                const chip = createChip(
+                    'aggregation-chip', !!aggregationState[stype], group.color || '#666',
+                    `${group.label} (${group.count})`
+                );
                 chip.dataset.serviceType = stype;
-                const isActive = !!aggregationState[stype];
-                chip.classList.add(isActive ? 'active' : 'inactive');
-                const color = group.color || '#666';
-                chip.style.borderColor = color;
-                chip.style.backgroundColor = isActive ? color : 'transparent';
-                chip.style.color = isActive ? 'white' : color;
-
-                chip.innerHTML = `<span class="chip-check">${{isActive ? '&#10003;' : ''}}</span>${{group.label}} (${{group.count}})`;
-
                 chip.addEventListener('click', () => toggleAggregation(stype));
-                chipsContainer.appendChild(chip);
-            }}
-        }}
+                frag.appendChild(chip);
+            }
+            chipsContainer.replaceChildren(frag);
+        }
+
+        function createChip(className, isActive, color, text) {
+            const chip = document.createElement('div');
+            chip.classList.add(className, isActive ? 'active' : 'inactive');
+            chip.style.borderColor = color;
+            chip.style.backgroundColor = isActive ? color : 'transparent';
+            chip.style.color = isActive ? 'white' : color;
+
+            const check = document.createElement('span');
+            check.className = 'chip-check';
+            check.textContent = isActive ? '\u2713' : '';
+            chip.append(check, text);
+            return chip;
+        }
 
-        function toggleAggregation(serviceType) {{
+        function toggleAggregation(serviceType) {
             const wasAggregated = aggregationState[serviceType];
             aggregationState[serviceType] = !wasAggregated;
 
-            if (aggregationState[serviceType]) {{
+            if (aggregationState[serviceType]) {
                 aggregateGroup(serviceType);
-            }} else {{
+            } else {
                 deaggregateGroup(serviceType);
-            }}
+            }
 
             // Update chip visual
             renderChipPanel();
 
             // Save state
             localStorage.setItem('diagramAggregationState', JSON.stringify(aggregationState));
-        }}
+        }
 
         // ============ CONNECTION TYPE FILTER ============
-        function initConnectionTypeFilter() {{
+        function initConnectionTypeFilter() {
             // Load saved state or default all visible
             const saved = localStorage.getItem('diagramConnTypeFilter');
             let loaded = null;
-            if (saved) {{
-                try {{ loaded = JSON.parse(saved); }} catch(e) {{}}
-            }}
-            for (const ct of CONNECTION_TYPES) {{
+            if (saved) {
+                try { loaded = JSON.parse(saved); } catch(e) {}
+            }
+            for (const ct of CONNECTION_TYPES) {
                 connTypeFilterState[ct.id] = loaded ? (loaded[ct.id] !== false) : true;
-            }}
+            }
             renderConnFilterPanel();
             applyConnTypeFilter();
-        }}
+        }
 
-        function renderConnFilterPanel() {{
+        function renderConnFilterPanel() {
             const container = document.getElementById('conn-filter-chips');
             if (!container) return;
-            container.innerHTML = '';
-
-            for (const ct of CONNECTION_TYPES) {{
-                const chip = document.createElement('div');
-                chip.classList.add('conn-filter-chip');
-                const isActive = connTypeFilterState[ct.id] !== false;
-                chip.classList.add(isActive ? 'active' : 'inactive');
-                chip.style.borderColor = ct.color;
-                chip.style.backgroundColor = isActive ? ct.color : 'transparent';
-                chip.style.color = isActive ? 'white' : ct.color;
-                chip.innerHTML = `<span class="chip-check">${{isActive ? '&#10003;' : ''}}</span>${{ct.label}}`;
+
+            const frag = document.createDocumentFragment();
+            for (const ct of CONNECTION_TYPES) {
+                const chip = createChip(
+                    'conn-filter-chip', connTypeFilterState[ct.id] !== false, ct.color, ct.label
+                );
                 chip.addEventListener('click', () => toggleConnTypeFilter(ct.id));
-                container.appendChild(chip);
-            }}
-        }}
+                frag.appendChild(chip);
+            }
+            container.replaceChildren(frag);
+        }
 
-        function toggleConnTypeFilter(connType) {{
+        function toggleConnTypeFilter(connType) {
             connTypeFilterState[connType] = connTypeFilterState[connType] === false;
             applyConnTypeFilter();
             renderConnFilterPanel();
             localStorage.setItem('diagramConnTypeFilter', JSON.stringify(connTypeFilterState));
-        }}
+        }
 
-        function applyConnTypeFilter() {{
+        function applyConnTypeFilter() {
             // Apply to original connections
-            document.querySelectorAll('.connection').forEach(conn => {{
+            document.querySelectorAll('.connection').forEach(conn => {
                 const ct = conn.dataset.connType || 'default';
-                if (connTypeFilterState[ct] === false) {{
+                if (connTypeFilterState[ct] === false) {
                     conn.classList.add('conn-type-hidden');
-                }} else {{
+                } else {
                     conn.classList.remove('conn-type-hidden');
-                }}
-            }});
+                }
+            });
             // Apply to aggregate connections
-            for (const conns of Object.values(aggregateConnections)) {{
-                conns.forEach(conn => {{
+            for (const conns of Object.values(aggregateConnections)) {
+                conns.forEach(conn => {
                     const ct = conn.dataset.connType || 'default';
-                    if (connTypeFilterState[ct] === false) {{
+                    if (connTypeFilterState[ct] === false) {
                         conn.classList.add('conn-type-hidden');
-                    }} else {{
+                    } else {
                         conn.classList.remove('conn-type-hidden');
-                    }}
-                }});
-            }}
-        }}
+                    }
+                });
+            }
+        }
 
         // ============ POPOVER ============
-        function showAggregatePopover(serviceType, clientX, clientY) {{
+        function showAggregatePopover(serviceType, clientX, clientY) {
             closeAggregatePopover();
             clearHighlights();
 
@@ -2416,168 +2314,161 @@ class HTMLRenderer:
 
             const header = document.createElement('div');
             header.classList.add('aggregate-popover-header');
-            header.textContent = `${{group.label}} (${{group.count}})`;
+            header.textContent = `${group.label} (${group.count})`;
             popover.appendChild(header);
 
-            group.serviceIds.forEach((sid, idx) => {{
+            group.serviceIds.forEach((sid, idx) => {
                 const item = document.createElement('div');
                 item.classList.add('aggregate-popover-item');
                 item.dataset.resourceId = sid;
 
-                const iconDiv = document.createElement('div');
-                iconDiv.innerHTML = group.iconHtml || '';
-                const innerSvg = iconDiv.querySelector('svg');
-                if (innerSvg) {{
-                    innerSvg.setAttribute('width', '24');
-                    innerSvg.setAttribute('height', '24');
-                }}
-                item.appendChild(innerSvg || iconDiv);
+                item.appendChild(getGroupIcon(serviceType, 24) || document.createElement('div'));
 
                 const nameSpan = document.createElement('span');
                 nameSpan.textContent = group.serviceNames[idx] || sid;
                 item.appendChild(nameSpan);
 
-                item.addEventListener('click', (e) => {{
+                item.addEventListener('click', (e) => {
                     e.stopPropagation();
                     selectResourceInPopover(sid, serviceType, item);
-                }});
+                });
 
                 popover.appendChild(item);
-            }});
+            });
 
             // Position popover near click
-            popover.style.left = `${{clientX + 10}}px`;
-            popover.style.top = `${{clientY + 10}}px`;
+            popover.style.left = `${clientX + 10}px`;
+            popover.style.top = `${clientY + 10}px`;
 
             document.body.appendChild(popover);
             activePopover = popover;
 
             // Adjust if off-screen
             const rect = popover.getBoundingClientRect();
-            if (rect.right > window.innerWidth) {{
-                popover.style.left = `${{clientX - rect.width - 10}}px`;
-            }}
-            if (rect.bottom > window.innerHeight) {{
-                popover.style.top = `${{clientY - rect.height - 10}}px`;
-            }}
+            if (rect.right > window.innerWidth) {
+                popover.style.left = `${clientX - rect.width - 10}px`;
+            }
+            if (rect.bottom > window.innerHeight) {
+                popover.style.top = `${clientY - rect.height - 10}px`;
+            }
 
             // Close on click outside (delayed to avoid immediate close)
-            setTimeout(() => {{
+            setTimeout(() => {
                 document.addEventListener('click', closePopoverOnOutsideClick);
-            }}, 10);
-        }}
+            }, 10);
+        }
 
-        function closePopoverOnOutsideClick(e) {{
-            if (activePopover && !activePopover.contains(e.target)) {{
+        function closePopoverOnOutsideClick(e) {
+            if (activePopover && !activePopover.contains(e.target)) {
                 closeAggregatePopover();
-            }}
-        }}
+            }
+        }
 
-        function closeAggregatePopover() {{
-            if (activePopover) {{
+        function closeAggregatePopover() {
+            if (activePopover) {
                 activePopover.remove();
                 activePopover = null;
                 selectedPopoverResource = null;
                 document.removeEventListener('click', closePopoverOnOutsideClick);
 
                 // Restore aggregate connections opacity
-                document.querySelectorAll('.aggregate-connection').forEach(c => {{
+                document.querySelectorAll('.aggregate-connection').forEach(c => {
                     c.style.opacity = '';
-                }});
+                });
                 // Remove any temporary highlight connections
                 document.querySelectorAll('.popover-highlight-conn').forEach(c => c.remove());
-            }}
-        }}
+            }
+        }
 
-        function selectResourceInPopover(resourceId, serviceType, itemEl) {{
+        function selectResourceInPopover(resourceId, serviceType, itemEl) {
             const group = AGGREGATION_CONFIG.groups[serviceType];
             if (!group) return;
             const groupIds = new Set(group.serviceIds);
 
             // Toggle selection
-            if (selectedPopoverResource === resourceId) {{
+            if (selectedPopoverResource === resourceId) {
                 // Deselect
                 selectedPopoverResource = null;
                 itemEl.classList.remove('selected');
                 // Restore ALL aggregate connections
-                for (const conns of Object.values(aggregateConnections)) {{
+                for (const conns of Object.values(aggregateConnections)) {
                     conns.forEach(c => c.style.opacity = '');
-                }}
+                }
                 document.querySelectorAll('.popover-highlight-conn').forEach(c => c.remove());
                 return;
-            }}
+            }
 
             // Clear previous selection
-            if (activePopover) {{
+            if (activePopover) {
                 activePopover.querySelectorAll('.aggregate-popover-item').forEach(i => i.classList.remove('selected'));
-            }}
+            }
             selectedPopoverResource = resourceId;
             itemEl.classList.add('selected');
 
             // Dim ALL aggregate connections (not just this group's)
-            for (const conns of Object.values(aggregateConnections)) {{
+            for (const conns of Object.values(aggregateConnections)) {
                 conns.forEach(c => c.style.opacity = '0.15');
-            }}
+            }
 
             // Remove previous highlight connections
             document.querySelectorAll('.popover-highlight-conn').forEach(c => c.remove());
 
             // Find original connections for this specific resource and draw them from aggregate node
-            const aggNodeId = `__agg_${{serviceType}}`;
+            const aggNodeId = `__agg_${serviceType}`;
             const aggPos = servicePositions[aggNodeId];
             if (!aggPos) return;
 
             const connLayer = document.getElementById('connections-layer');
-            const styles = {{
-                'data_flow': {{ color: '#3B48CC', dash: '', marker: 'url(#arrowhead-data)' }},
-                'trigger': {{ color: '#E7157B', dash: '', marker: 'url(#arrowhead-trigger)' }},
-                'encrypt': {{ color: '#6c757d', dash: '4,4', marker: 'url(#arrowhead)' }},
-                'network_flow': {{ color: '#0d7c3f', dash: '', marker: 'url(#arrowhead-network)' }},
-                'security_rule': {{ color: '#d97706', dash: '2,4', marker: 'url(#arrowhead-security)' }},
-                'default': {{ color: '#999999', dash: '', marker: 'url(#arrowhead)' }},
-            }};
+            const styles = {
+                'data_flow': { color: '#3B48CC', dash: '', marker: 'url(#arrowhead-data)' },
+                'trigger': { color: '#E7157B', dash: '', marker: 'url(#arrowhead-trigger)' },
+                'encrypt': { color: '#6c757d', dash: '4,4', marker: 'url(#arrowhead)' },
+                'network_flow': { color: '#0d7c3f', dash: '', marker: 'url(#arrowhead-network)' },
+                'security_rule': { color: '#d97706', dash: '2,4', marker: 'url(#arrowhead-security)' },
+                'default': { color: '#999999', dash: '', marker: 'url(#arrowhead)' },
+            };
 
             // Build map of which IDs are in aggregated groups (for resolving targets)
-            const idToAggGroup = {{}};
-            for (const [stype, isAgg] of Object.entries(aggregationState)) {{
+            const idToAggGroup = {};
+            for (const [stype, isAgg] of Object.entries(aggregationState)) {
                 if (!isAgg || stype === serviceType) continue;
                 const g = AGGREGATION_CONFIG.groups[stype];
                 if (!g) continue;
-                for (const sid of g.serviceIds) {{
+                for (const sid of g.serviceIds) {
                     idToAggGroup[sid] = stype;
-                }}
-            }}
+                }
+            }
 
             // Collect and deduplicate highlight connections
-            const hlMerged = {{}};
-            for (const conn of originalConnections) {{
+            const hlMerged = {};
+            for (const conn of originalConnections) {
                 let externalId = null;
                 let direction = null;
 
-                if (conn.sourceId === resourceId && !groupIds.has(conn.targetId)) {{
+                if (conn.sourceId === resourceId && !groupIds.has(conn.targetId)) {
                     externalId = conn.targetId;
                     direction = 'out';
-                }} else if (conn.targetId === resourceId && !groupIds.has(conn.sourceId)) {{
+                } else if (conn.targetId === resourceId && !groupIds.has(conn.sourceId)) {
                     externalId = conn.sourceId;
                     direction = 'in';
-                }}
+                }
 
                 if (!externalId) continue;
 
                 // Resolve external ID to aggregate node if the target is in another aggregated group
-                const resolvedId = idToAggGroup[externalId] ? `__agg_${{idToAggGroup[externalId]}}` : externalId;
+                const resolvedId = idToAggGroup[externalId] ? `__agg_${idToAggGroup[externalId]}` : externalId;
                 const hlSource = direction === 'out' ? aggNodeId : resolvedId;
                 const hlTarget = direction === 'out' ? resolvedId : aggNodeId;
-                const key = `${{hlSource}}|${{hlTarget}}|${{conn.connType || 'default'}}`;
+                const key = `${hlSource}|${hlTarget}|${conn.connType || 'default'}`;
 
-                if (!hlMerged[key]) {{
-                    hlMerged[key] = {{ source: hlSource, target: hlTarget, connType: conn.connType || 'default', count: 0 }};
-                }}
+                if (!hlMerged[key]) {
+                    hlMerged[key] = { source: hlSource, target: hlTarget, connType: conn.connType || 'default', count: 0 };
+                }
                 hlMerged[key].count++;
-            }}
+            }
 
             // Draw deduplicated highlight connections
-            for (const [key, info] of Object.entries(hlMerged)) {{
+            for (const [key, info] of Object.entries(hlMerged)) {
                 const sourcePos = servicePositions[info.source];
                 const targetPos = servicePositions[info.target];
                 if (!sourcePos || !targetPos) continue;
@@ -2589,9 +2480,9 @@ class HTMLRenderer:
                 const connG = document.createElementNS('http://www.w3.org/2000/svg', 'g');
                 connG.classList.add('connection', 'popover-highlight-conn');
                 connG.dataset.connType = info.connType;
-                if (connTypeFilterState[info.connType] === false) {{
+                if (connTypeFilterState[info.connType] === false) {
                     connG.classList.add('conn-type-hidden');
-                }}
+                }
                 connG.dataset.source = info.source;
                 connG.dataset.target = info.target;
 
@@ -2608,185 +2499,180 @@ class HTMLRenderer:
                 pathEl.setAttribute('d', pathD);
                 pathEl.setAttribute('fill', 'none');
                 pathEl.setAttribute('stroke', style.color);
-                pathEl.setAttribute('stroke-width', `${{strokeWidth}}`);
+                pathEl.setAttribute('stroke-width', `${strokeWidth}`);
                 if (style.dash) pathEl.setAttribute('stroke-dasharray', style.dash);
                 pathEl.setAttribute('marker-end', style.marker);
                 pathEl.setAttribute('opacity', '1');
                 connG.appendChild(pathEl);
 
-                if (info.count > 1) {{
+                if (info.count > 1) {
                     const midX = (sourcePos.x + targetPos.x) / 2 + iconSize / 2;
                     const midY = (sourcePos.y + targetPos.y) / 2 + iconSize / 2;
                     const multLabel = document.createElementNS('http://www.w3.org/2000/svg', 'text');
                     multLabel.classList.add('multiplicity-label');
-                    multLabel.setAttribute('x', `${{midX + 8}}`);
-                    multLabel.setAttribute('y', `${{midY - 5}}`);
+                    multLabel.setAttribute('x', `${midX + 8}`);
+                    multLabel.setAttribute('y', `${midY - 5}`);
                     multLabel.setAttribute('font-family', 'Arial, sans-serif');
                     multLabel.setAttribute('font-size', '10');
                     multLabel.setAttribute('font-weight', 'bold');
                     multLabel.setAttribute('fill', style.color);
-                    multLabel.textContent = `x${{info.count}}`;
+                    multLabel.textContent = `x${info.count}`;
                     connG.appendChild(multLabel);
-                }}
+                }
 
                 connLayer.appendChild(connG);
-            }}
-        }}
+            }
+        }
 
         // ============ AGGREGATION-AWARE DRAG ============
         // Override updateConnectionsFor to also handle aggregate connections
-        updateConnectionsFor = function(serviceId) {{
+        updateConnectionsFor = function(serviceId) {
             // Update original connections
             _baseUpdateConnectionsFor(serviceId);
 
             // Update aggregate connections involving this serviceId
-            document.querySelectorAll(`.aggregate-connection[data-source="${{serviceId}}"], .aggregate-connection[data-target="${{serviceId}}"]`).forEach(conn => {{
+            document.querySelectorAll(`.aggregate-connection[data-source="${serviceId}"], .aggregate-connection[data-target="${serviceId}"]`).forEach(conn => {
                 updateConnection(conn);
-            }});
+            });
 
             // Also update popover highlight connections
-            document.querySelectorAll(`.popover-highlight-conn`).forEach(conn => {{
-                const sId = conn.dataset.source;
-                const tId = conn.dataset.target;
-                if (sId === serviceId || tId === serviceId) {{
-                    const sPos = servicePositions[sId];
-                    const tPos = servicePositions[tId];
-                    if (sPos && tPos) {{
-                        const pathD = calcConnectionPath(sPos, tPos);
-                        const pathEl = conn.querySelector('.connection-path');
-                        const hitEl = conn.querySelector('.connection-hitarea');
-                        if (pathEl) pathEl.setAttribute('d', pathD);
-                        if (hitEl) hitEl.setAttribute('d', pathD);
-                        // Update multiplicity label position
-                        const multLabel = conn.querySelector('.multiplicity-label');
-                        if (multLabel) {{
-                            const midX = (sPos.x + tPos.x) / 2 + iconSize / 2;
-                            const midY = (sPos.y + tPos.y) / 2 + iconSize / 2;
-                            multLabel.setAttribute('x', `${{midX + 8}}`);
-                            multLabel.setAttribute('y', `${{midY - 5}}`);
-                        }}
-                    }}
-                }}
-            }});
-        }};
+            document.querySelectorAll(`.popover-highlight-conn`).forEach(conn => {
+                if (conn.dataset.source === serviceId || conn.dataset.target === serviceId) {
+                    updateConnection(conn);
+                }
+            });
+        };
 
         // ============ PERSISTENCE INTEGRATION ============
         // Override save/load/reset to include aggregation state
 
-        savePositions = function() {{
+        savePositions = async function() {
             // Save positions (including aggregate node positions)
-            const data = JSON.stringify(servicePositions);
-            localStorage.setItem('diagramPositions', data);
+            await storeLayout(servicePositions);
             // Save aggregation state
             localStorage.setItem('diagramAggregationState', JSON.stringify(aggregationState));
             // Save connection type filter state
             localStorage.setItem('diagramConnTypeFilter', JSON.stringify(connTypeFilterState));
-            alert('Layout and aggregation state saved!');
-        }};
+            showToast('Layout and aggregation state saved!');
+        };
 
-        loadPositions = function() {{
-            const data = localStorage.getItem('diagramPositions');
-            if (!data) {{
-                alert('No saved layout found.');
+        loadPositions = async function() {
+            const saved = await fetchLayout();
+            if (!saved) {
+                showToast('No saved layout found.');
                 return;
-            }}
-
-            const saved = JSON.parse(data);
-            Object.keys(saved).forEach(id => {{
-                if (servicePositions[id] !== undefined) {{
-                    servicePositions[id] = saved[id];
-                    const el = document.querySelector(`[data-service-id="${{id}}"]`);
-                    if (el) {{
-                        el.setAttribute('transform', `translate(${{saved[id].x}}, ${{saved[id].y}})`);
-                    }}
-                }}
-            }});
+            }
+
+            Object.keys(saved).forEach(id => {
+                if (servicePositions[id] !== undefined) {
+                    setServicePosition(id, saved[id].x, saved[id].y);
+                    const el = serviceEls.get(id);
+                    if (el) {
+                        el.setAttribute('transform', `translate(${saved[id].x}, ${saved[id].y})`);
+                    }
+                }
+            });
 
             // Load aggregation state
             const aggData = localStorage.getItem('diagramAggregationState');
-            if (aggData) {{
-                try {{
+            if (aggData) {
+                try {
                     const savedAgg = JSON.parse(aggData);
-                    for (const [stype, isAgg] of Object.entries(savedAgg)) {{
-                        if (aggregationState[stype] !== undefined && aggregationState[stype] !== isAgg) {{
+                    for (const [stype, isAgg] of Object.entries(savedAgg)) {
+                        if (aggregationState[stype] !== undefined && aggregationState[stype] !== isAgg) {
                             toggleAggregation(stype);
-                        }}
-                    }}
-                }} catch(e) {{}}
-            }}
+                        }
+                    }
+                } catch(e) {}
+            }
 
             // Load connection type filter state
             const ctData = localStorage.getItem('diagramConnTypeFilter');
-            if (ctData) {{
-                try {{
+            if (ctData) {
+                try {
                     const savedCt = JSON.parse(ctData);
-                    for (const ct of CONNECTION_TYPES) {{
-                        if (savedCt[ct.id] !== undefined) {{
+                    for (const ct of CONNECTION_TYPES) {
+                        if (savedCt[ct.id] !== undefined) {
                             connTypeFilterState[ct.id] = savedCt[ct.id];
-                        }}
-                    }}
+                        }
+                    }
                     renderConnFilterPanel();
                     applyConnTypeFilter();
-                }} catch(e) {{}}
-            }}
+                } catch(e) {}
+            }
 
             updateAllConnections();
-            alert('Layout loaded!');
-        }};
+            showToast('Layout loaded!');
+        };
 
-        resetPositions = function() {{
+        resetPositions = function() {
             // Reset individual node positions
-            Object.keys(originalPositions).forEach(id => {{
-                servicePositions[id] = {{ ...originalPositions[id] }};
-                const el = document.querySelector(`[data-service-id="${{id}}"]`);
-                if (el) {{
-                    el.setAttribute('transform', `translate(${{originalPositions[id].x}}, ${{originalPositions[id].y}})`);
-                }}
-            }});
+            Object.keys(originalPositions).forEach(id => {
+                setServicePosition(id, originalPositions[id].x, originalPositions[id].y);
+                const el = serviceEls.get(id);
+                if (el) {
+                    el.setAttribute('transform', `translate(${originalPositions[id].x}, ${originalPositions[id].y})`);
+                }
+            });
 
             // Reset aggregation to defaults
-            for (const [stype, group] of Object.entries(AGGREGATION_CONFIG.groups)) {{
-                if (group.count >= AGGREGATION_CONFIG.threshold) {{
+            for (const [stype, group] of Object.entries(AGGREGATION_CONFIG.groups)) {
+                if (group.count >= AGGREGATION_CONFIG.threshold) {
                     const shouldAgg = group.defaultAggregated;
-                    if (aggregationState[stype] !== shouldAgg) {{
+                    if (aggregationState[stype] !== shouldAgg) {
                         aggregationState[stype] = shouldAgg;
-                        if (shouldAgg) {{
+                        if (shouldAgg) {
                             aggregateGroup(stype);
-                        }} else {{
+                        } else {
                             deaggregateGroup(stype);
-                        }}
-                    }} else if (shouldAgg && aggregateNodes[stype]) {{
+                        }
+                    } else if (shouldAgg && aggregateNodes[stype]) {
                         // Recalculate centroid with reset positions
                         const centroid = computeCentroid(stype);
-                        servicePositions[`__agg_${{stype}}`] = centroid;
-                        aggregateNodes[stype].setAttribute('transform', `translate(${{centroid.x}}, ${{centroid.y}})`);
-                    }}
-                }}
-            }}
+                        setServicePosition(`__agg_${stype}`, centroid.x, centroid.y);
+                        aggregateNodes[stype].setAttribute('transform', `translate(${centroid.x}, ${centroid.y})`);
+                    }
+                }
+            }
 
             renderChipPanel();
             updateAllConnections();
             // Also update aggregate connections
-            for (const [stype, conns] of Object.entries(aggregateConnections)) {{
+            for (const [stype, conns] of Object.entries(aggregateConnections)) {
                 conns.forEach(c => updateConnection(c));
-            }}
+            }
 
             localStorage.removeItem('diagramAggregationState');
 
             // Reset connection type filter to all visible
-            for (const ct of CONNECTION_TYPES) {{
+            for (const ct of CONNECTION_TYPES) {
                 connTypeFilterState[ct.id] = true;
-            }}
+            }
             renderConnFilterPanel();
             applyConnTypeFilter();
             localStorage.removeItem('diagramConnTypeFilter');
-        }};
+        };
     </script>
 </body>
 </html>"""
 
-    def __init__(self, svg_renderer: SVGRenderer):
+    # Above this many connections, lines are painted on a canvas instead of as SVG paths
+    CANVAS_CONNECTION_THRESHOLD = 500
+
+    def __init__(
+        self,
+        svg_renderer: SVGRenderer,
+        canvas_connection_threshold: Optional[int] = None,
+        export_quality: float = 0.9,
+    ):
         self.svg_renderer = svg_renderer
+        # Encoder quality (0-1) for JPEG/WebP exports
+        self.export_quality = export_quality
+        self.canvas_connection_threshold = (
+            canvas_connection_threshold
+            if canvas_connection_threshold is not None
+            else self.CANVAS_CONNECTION_THRESHOLD
+        )
 
     def render_html(
         self,
@@ -2797,6 +2683,7 @@ class HTMLRenderer:
         actual_height: Optional[int] = None,
     ) -> str:
         """Generate complete HTML page with interactive diagram."""
+        canvas_connections = len(aggregated.connections) > self.canvas_connection_threshold
         svg_content = self.svg_renderer.render_svg(
             aggregated.services,
             positions,
@@ -2804,9 +2691,13 @@ class HTMLRenderer:
             groups,
             vpc_structure=aggregated.vpc_structure,
             actual_height=actual_height,
+            canvas_connections=canvas_connections,
         )
 
-        total_resources = sum(len(s.resources) for s in aggregated.services)
+        # Results assembled by hand (rather than by the aggregator) leave the count at 0
+        total_resources = aggregated.total_resources or sum(
+            len(s.resources) for s in aggregated.services
+        )
 
         # Build aggregation config for client-side JS
         agg_metadata = ResourceAggregator.get_aggregation_metadata(aggregated)
@@ -2838,14 +2729,20 @@ class HTMLRenderer:
                 "serviceNames": info["service_names"],
             }
 
-        html_content = self.HTML_TEMPLATE.format(
-            svg_content=svg_content,
-            service_count=len(aggregated.services),
-            resource_count=total_resources,
-            connection_count=len(aggregated.connections),
-            environment=environment,
-            icon_size=self.svg_renderer.config.icon_size,
-            aggregation_config_json=json.dumps(agg_config),
+        html_content = _fill_template(
+            self.HTML_TEMPLATE,
+            {
+                "SVG_CONTENT": svg_content,
+                "SERVICE_COUNT": str(len(aggregated.services)),
+                "RESOURCE_COUNT": str(total_resources),
+                "CONNECTION_COUNT": str(len(aggregated.connections)),
+                "ENVIRONMENT": environment,
+                "ICON_SIZE": str(self.svg_renderer.config.icon_size),
+                "STYLESHEET": _load_stylesheet(),
+                "EXPORT_QUALITY": str(self.export_quality),
+                "CANVAS_CONNECTIONS": "true" if canvas_connections else "false",
+                "AGGREGATION_CONFIG_JSON": json.dumps(agg_config),
+            },
         )
 
         return html_content
@@ -10,14 +10,34 @@ import logging
 import re
 import shutil
 import subprocess
+import tempfile
+import threading
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ._compat import DATACLASS_SLOTS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
+# Index suffixes in state addresses: count ([0]) or for_each (["key"])
+_RE_INDEX_ANY = re.compile(r'\[(?:\d+|"[^"]+")\]')
+_RE_INDEX_TRAILING = re.compile(r'\[(?:\d+|"[^"]+")\]$')
+
 
-@dataclass
+@lru_cache(maxsize=8192)
+def _strip_trailing_index(address: str) -> str:
+    """Remove a trailing count/for_each index from an address."""
+    return _RE_INDEX_TRAILING.sub("", address)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class TerraformStateResource:
     """A resource from terraform state/plan JSON output."""
 
@@ -31,10 +51,9 @@ class TerraformStateResource:
     @property
     def base_address(self) -> str:
         """Address without index, e.g., 'aws_subnet.public' from 'aws_subnet.public[0]' or 'aws_subnet.public[\"key\"]'."""
-        # Remove numeric index [0] or string index ["key"]
-        address = re.sub(r"\[\d+\]$", "", self.address)
-        address = re.sub(r'\["[^"]+"\]$', "", address)
-        return address
+        # Remove numeric index [0] or string index ["key"]. Cached per address
+        # string rather than per instance so the class can stay slotted.
+        return _strip_trailing_index(self.address)
 
     @property
     def full_id(self) -> str:
@@ -44,30 +63,67 @@ class TerraformStateResource:
         return f"{self.resource_type}.{self.name}"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class TerraformStateResult:
     """Result from parsing terraform show/plan JSON output."""
 
     resources: List[TerraformStateResource] = field(default_factory=list)
 
 
+# Where root_module lives, in order of preference:
+# terraform show -json, terraform plan -json (planned), plan's existing state
+_ROOT_PATHS = (
+    ("values", "root_module"),
+    ("planned_values", "root_module"),
+    ("prior_state", "values", "root_module"),
+)
+
+
+def _loads_json(data: Union[bytes, bytearray]) -> Any:
+    """Decode JSON bytes, using orjson when it is installed.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+    catching the stdlib exception either way.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _looks_like_state(data: Union[bytes, bytearray]) -> bool:
+    """Cheaply check whether JSON bytes can contain a terraform root_module.
+
+    Every layout in _ROOT_PATHS nests a "root_module" key, so JSON without that
+    byte sequence would parse to an empty result. The substring scan is far
+    cheaper than decoding a large unrelated file only to discard it.
+    """
+    return b'"root_module"' in data
+
+
 class TerraformToolsRunner:
     """Executes terraform commands and parses their output."""
 
     TIMEOUT_SHOW = 120  # seconds
+    READ_CHUNK_SIZE = 1 << 20  # bytes read from the terraform show pipe at a time
 
     def __init__(self, terraform_dir: Path, terraform_bin: str = "terraform"):
         self.terraform_dir = Path(terraform_dir)
         self.terraform_bin = terraform_bin
+        # Results of the environment checks, computed on first use
+        self._terraform_path: Optional[str] = None
+        self._initialized: Optional[bool] = None
 
     def check_terraform_available(self) -> bool:
         """Check if terraform CLI is available in PATH."""
-        return shutil.which(self.terraform_bin) is not None
+        if self._terraform_path is None:
+            self._terraform_path = shutil.which(self.terraform_bin) or ""
+        return bool(self._terraform_path)
 
     def check_initialized(self) -> bool:
         """Check if terraform init has been run in the directory."""
-        terraform_dir = self.terraform_dir / ".terraform"
-        return terraform_dir.exists() and terraform_dir.is_dir()
+        if self._initialized is None:
+            self._initialized = (self.terraform_dir / ".terraform").is_dir()
+        return self._initialized
 
     def run_show_json(self, state_file: Optional[Path] = None) -> Optional[TerraformStateResult]:
         """Run terraform show -json and parse the state output.
@@ -86,8 +142,7 @@ class TerraformToolsRunner:
         if state_file is not None:
             if state_file.exists():
                 try:
-                    with open(state_file, "r", encoding="utf-8") as f:
-                        json_data = json.load(f)
+                    json_data = _loads_json(state_file.read_bytes())
                     result = parse_state_json(json_data)
                     if result and result.resources:
                         logger.info(
@@ -117,8 +172,11 @@ class TerraformToolsRunner:
         for json_file in json_files:
             if json_file.exists():
                 try:
-                    with open(json_file, "r", encoding="utf-8") as f:
-                        json_data = json.load(f)
+                    data = json_file.read_bytes()
+                    if not _looks_like_state(data):
+                        logger.debug("Skipping %s: not terraform state JSON", json_file.name)
+                        continue
+                    json_data = _loads_json(data)
 
                     result = parse_state_json(json_data)
                     if result and result.resources:
@@ -145,24 +203,18 @@ class TerraformToolsRunner:
             return None
 
         try:
-            result = subprocess.run(
-                [self.terraform_bin, "show", "-json"],
-                cwd=self.terraform_dir,
-                capture_output=True,
-                text=True,
-                timeout=self.TIMEOUT_SHOW,
-            )
+            returncode, output, stderr = self._stream_show_json()
 
-            if result.returncode != 0:
-                logger.warning("terraform show -json failed: %s", result.stderr)
+            if returncode != 0:
+                logger.warning("terraform show -json failed: %s", stderr)
                 return None
 
-            if not result.stdout.strip():
+            if not _looks_like_state(output):
                 logger.info("No terraform state found")
                 return None
 
             try:
-                json_data = json.loads(result.stdout)
+                json_data = _loads_json(output)
             except json.JSONDecodeError as e:
                 logger.warning("Failed to parse terraform show output: %s", e)
                 return None
@@ -176,6 +228,58 @@ class TerraformToolsRunner:
             logger.warning("Error running terraform show: %s", e)
             return None
 
+    def _stream_show_json(self) -> Tuple[int, bytearray, str]:
+        """Run terraform show -json, reading stdout incrementally.
+
+        stdout is accumulated into a single bytearray rather than buffered by
+        communicate(), which joins a list of chunks and briefly holds the output
+        twice. stderr goes to a temporary file so a chatty terraform cannot
+        fill the pipe and deadlock the read.
+
+        Returns:
+            Tuple of (return code, raw stdout, decoded stderr).
+
+        Raises:
+            subprocess.TimeoutExpired: If terraform runs longer than TIMEOUT_SHOW.
+        """
+        cmd = [self.terraform_bin, "show", "-json"]
+        timed_out = threading.Event()
+
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(
+                cmd, cwd=self.terraform_dir, stdout=subprocess.PIPE, stderr=stderr_file
+            )
+            assert proc.stdout is not None  # stdout=PIPE always creates the pipe
+
+            def _kill() -> None:
+                timed_out.set()
+                proc.kill()
+
+            timer = threading.Timer(self.TIMEOUT_SHOW, _kill)
+            timer.start()
+            try:
+                output = bytearray()
+                with proc.stdout:
+                    while True:
+                        chunk = proc.stdout.read(self.READ_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        output += chunk
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, self.TIMEOUT_SHOW)
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+
+        return returncode, output, stderr
+
 
 def parse_state_json(json_data: Any) -> TerraformStateResult:
     """Parse terraform show -json or terraform plan -json output.
@@ -220,44 +324,32 @@ def parse_state_json(json_data: Any) -> TerraformStateResult:
         logger.warning("parse_state_json received non-dict input: %s", type(json_data).__name__)
         return result
 
-    # Try different JSON structures in order of preference
+    # Try the known JSON structures in order of preference
     root_module = None
-
-    # 1. Try "values" (terraform show -json format)
-    values = json_data.get("values")
-    if values:
-        root_module = values.get("root_module")
-        if root_module:
-            logger.debug("Using 'values.root_module' structure (terraform show format)")
-
-    # 2. Try "planned_values" (terraform plan -json format)
-    if not root_module:
-        planned_values = json_data.get("planned_values")
-        if planned_values:
-            root_module = planned_values.get("root_module")
-            if root_module:
-                logger.debug("Using 'planned_values.root_module' structure (terraform plan format)")
-
-    # 3. Try "prior_state.values" (terraform plan -json format, existing state)
-    if not root_module:
-        prior_state = json_data.get("prior_state")
-        if prior_state:
-            prior_values = prior_state.get("values")
-            if prior_values:
-                root_module = prior_values.get("root_module")
-                if root_module:
-                    logger.debug("Using 'prior_state.values.root_module' structure")
+    for path in _ROOT_PATHS:
+        node: Any = json_data
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+            if not node:
+                break
+        if node:
+            root_module = node
+            logger.debug("Using '%s' structure", ".".join(path))
+            break
 
     if not root_module:
         logger.debug("No root_module found in terraform JSON")
         return result
 
-    # Parse root module resources
-    _parse_module_resources(root_module, result, module_path="")
-
-    # Parse child modules recursively
-    for child_module in root_module.get("child_modules", []):
-        _parse_child_module(child_module, result)
+    # Walk the module tree depth-first with an explicit stack so deeply nested
+    # modules neither pay per-frame call overhead nor hit the recursion limit.
+    # Children are pushed in reverse to keep the original pre-order.
+    stack = [(root_module, "")]
+    while stack:
+        module_data, module_path = stack.pop()
+        _parse_module_resources(module_data, result, module_path)
+        for child in reversed(module_data.get("child_modules", [])):
+            stack.append((child, _module_path_from_address(child.get("address", ""))))
 
     logger.debug("Parsed terraform state: %d resources", len(result.resources))
 
@@ -291,28 +383,24 @@ def _parse_module_resources(
             result.resources.append(state_resource)
 
 
-def _parse_child_module(module_data: dict, result: TerraformStateResult) -> None:
-    """Recursively parse a child module from state JSON."""
-    address = module_data.get("address", "")
+def _module_path_from_address(address: str) -> str:
+    """Extract the module path from a child module address.
 
-    # Extract module path from address (e.g., "module.vpc" -> "vpc")
-    module_path = ""
-    if address.startswith("module."):
-        # Handle nested modules: "module.vpc.module.subnets" -> "vpc.subnets"
-        parts = address.split(".")
-        module_parts = []
-        for i, part in enumerate(parts):
-            if part != "module" and (i == 0 or parts[i - 1] == "module"):
-                module_parts.append(part)
-        module_path = ".".join(module_parts)
-
-    _parse_module_resources(module_data, result, module_path)
-
-    # Recurse into nested child modules
-    for child in module_data.get("child_modules", []):
-        _parse_child_module(child, result)
+    Examples:
+        "module.vpc" -> "vpc"
+        "module.vpc.module.subnets" -> "vpc.subnets"
+    """
+    if not address.startswith("module."):
+        return ""
+    parts = address.split(".")
+    module_parts = []
+    for i, part in enumerate(parts):
+        if part != "module" and (i == 0 or parts[i - 1] == "module"):
+            module_parts.append(part)
+    return ".".join(module_parts)
 
 
+@lru_cache(maxsize=8192)
 def map_state_to_resource_id(state_address: str) -> str:
     """Convert terraform state address to parser resource full_id format.
 
@@ -328,8 +416,7 @@ def map_state_to_resource_id(state_address: str) -> str:
         Resource ID matching parser's full_id format
     """
     # Remove index brackets
-    address = re.sub(r"\[\d+\]", "", state_address)
-    address = re.sub(r'\["[^"]+"\]', "", address)
+    address = _RE_INDEX_ANY.sub("", state_address)
 
     # Handle module prefix
     if address.startswith("module."):
@@ -4,103 +4,261 @@ Variable Resolver Module
 Parses and resolves Terraform variables, locals, and interpolations.
 """
 
+import hashlib
+import json
 import logging
+import os
 import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 
 import hcl2
 from lark.exceptions import UnexpectedInput, UnexpectedToken
 
 logger = logging.getLogger(__name__)
 
+# Matches ${var.name} or ${local.name}; group 1 is the reference ("var.name")
+_RE_INTERPOLATION = re.compile(r"\$\{((?:var|local)\.\w+)\}")
+_RE_REFERENCE = re.compile(r"(?:var|local)\.\w+")
+
+# Overrides the directory for cached hcl2 parse results; set it to an empty
+# string to disable the cache
+CACHE_DIR_ENV = "TERRAFORMGRAPH_CACHE_DIR"
+
+
+@lru_cache(maxsize=None)
+def _hcl2_version() -> str:
+    """Return the installed python-hcl2 version, part of every cache key."""
+    try:
+        from importlib.metadata import version
+
+        return version("python-hcl2")
+    except Exception:  # pragma: no cover - metadata missing in odd installs
+        return "unknown"
+
+
+def _hcl_cache_dir() -> Optional[str]:
+    """Return the directory for cached parse results, or None if disabled."""
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override is not None:
+        return override or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "terraformgraph", "hcl")
+
+
+def _load_hcl_cached(path: str) -> Dict[str, Any]:
+    """Parse an HCL file, reusing a cached result while the file is unchanged.
+
+    Results are stored as JSON keyed by (absolute path, mtime, size, hcl2
+    version). Any cache problem falls back to a normal parse; parse and read
+    errors propagate exactly as from hcl2.loads().
+    """
+    cache_dir = _hcl_cache_dir()
+    # Plain string paths: this runs once per file, so skip building Path objects
+    cache_file: Optional[str] = None
+    if cache_dir is not None:
+        try:
+            st = os.stat(path)
+            key = f"{_hcl2_version()}\0{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+            cache_file = os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if isinstance(cached, dict):
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    content = hcl2.loads(text)
+
+    if cache_dir is not None and cache_file is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write then rename so concurrent runs never read a partial file
+            fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(content, f)
+                os.replace(tmp_name, cache_file)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug("Could not cache parse result for %s: %s", path, e)
+
+    return content
+
+
+def _try_load_hcl(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+    """Load an HCL file, returning the read/parse error instead of raising it."""
+    try:
+        return _load_hcl_cached(path), None
+    except (OSError, UnexpectedInput, UnexpectedToken) as e:
+        return None, e
+
 
 class VariableResolver:
     """Resolves Terraform variables and locals from tfvars and .tf files."""
 
+    # Below this many .tf files the files are loaded sequentially
+    PARALLEL_LOAD_MIN_FILES = 4
+    MAX_LOAD_WORKERS = 8
+
     def __init__(self, directory: Union[str, Path]):
-        """Initialize the resolver by parsing files in the given directory.
+        """Initialize the resolver for the given directory.
+
+        Files are parsed lazily, on the first lookup or interpolation, so a
+        resolver that is never queried costs nothing.
 
         Args:
             directory: Path to directory containing Terraform files
         """
         self.directory = Path(directory)
-        self._variables: Dict[str, Any] = {}
-        self._locals: Dict[str, Any] = {}
+        # Variables and locals keyed by reference, e.g. "var.env", "local.prefix".
+        # Built by _ensure_parsed(), then frozen behind a read-only proxy.
+        self._refs: Mapping[str, Any] = {}
+        # Bound get() of the underlying dict, skipping the proxy on hot lookups
+        self._lookup_ref: Callable[[str], Any] = self._refs.get
+        # Interpolated string -> resolved string; variables and locals do not
+        # change after parsing, so entries never go stale
+        self._resolve_cache: Dict[str, str] = {}
+        self._parsed = False
+
+    def _ensure_parsed(self) -> None:
+        """Parse the directory's files on first use."""
+        if self._parsed:
+            return
 
         # Parse files in order of precedence
-        self._parse_variable_defaults()
-        self._parse_tfvars()
-        self._parse_locals()
+        # (variable defaults from .tf files, then tfvars overrides)
+        refs: Dict[str, Any] = {}
+        tf_files, tfvars_files = self._scan_directory()
+        self._parse_tf_files(tf_files, refs)
+        self._parse_tfvars(tfvars_files, refs)
+
+        # Values never change after parsing, which _resolve_cache relies on
+        self._refs = MappingProxyType(refs)
+        self._lookup_ref = refs.get
+        # Only now: a parse that raised is retried (and raises again) on the
+        # next lookup instead of leaving the resolver silently empty
+        self._parsed = True
+
+    def _scan_directory(self) -> Tuple[List[str], List[str]]:
+        """List the directory once and classify the Terraform files in it.
 
-    def _parse_tfvars(self) -> None:
+        Returns:
+            Tuple of (.tf files, tfvars files in precedence order). The tfvars
+            list holds the .auto.tfvars files alphabetically, followed by
+            terraform.tfvars which has the highest precedence. Paths are the
+            plain strings from os.scandir; no Path objects are built.
+        """
+        tf_files: List[str] = []
+        auto_tfvars: List[str] = []
+        terraform_tfvars: List[str] = []
+
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.endswith(".tf"):
+                        bucket = tf_files
+                    elif name.endswith(".auto.tfvars"):
+                        bucket = auto_tfvars
+                    elif name == "terraform.tfvars":
+                        bucket = terraform_tfvars
+                    else:
+                        continue
+                    # is_file() uses the type scandir already read; no extra stat
+                    if entry.is_file():
+                        bucket.append(entry.path)
+        except OSError as e:
+            logger.debug("Could not list directory %s: %s", self.directory, e)
+
+        tf_files.sort()
+        auto_tfvars.sort()
+        return tf_files, auto_tfvars + terraform_tfvars
+
+    def _parse_tfvars(self, tfvars_files: List[str], refs: Dict[str, Any]) -> None:
         """Parse .tfvars and .auto.tfvars files for variable values.
 
         Files are parsed in alphabetical order, with later files overriding earlier ones.
         terraform.tfvars is parsed last to give it highest precedence.
         """
-        tfvars_files = []
-
-        # Collect .auto.tfvars files
-        tfvars_files.extend(sorted(self.directory.glob("*.auto.tfvars")))
-
-        # Add terraform.tfvars last (highest precedence)
-        terraform_tfvars = self.directory / "terraform.tfvars"
-        if terraform_tfvars.exists():
-            tfvars_files.append(terraform_tfvars)
-
         for tfvars_file in tfvars_files:
             try:
-                with open(tfvars_file, "r", encoding="utf-8") as f:
-                    content = hcl2.load(f)
-                    for key, value in content.items():
-                        self._variables[key] = value
+                content = _load_hcl_cached(tfvars_file)
+                for key, value in content.items():
+                    refs["var." + key] = value
             except OSError as e:
                 logger.warning("Could not read tfvars file %s: %s", tfvars_file, e)
             except (UnexpectedInput, UnexpectedToken) as e:
                 logger.warning("Could not parse tfvars file %s: %s", tfvars_file, e)
 
-    def _parse_locals(self) -> None:
-        """Parse locals blocks from all .tf files."""
-        for tf_file in self.directory.glob("*.tf"):
-            try:
-                with open(tf_file, "r", encoding="utf-8") as f:
-                    content = hcl2.load(f)
+    def _parse_tf_files(self, tf_files: List[str], refs: Dict[str, Any]) -> None:
+        """Parse variable defaults and locals blocks from all .tf files.
 
-                for locals_block in content.get("locals", []):
-                    if isinstance(locals_block, dict):
-                        for key, value in locals_block.items():
-                            self._locals[key] = value
-            except OSError as e:
-                logger.warning("Could not read file %s: %s", tf_file, e)
-            except (UnexpectedInput, UnexpectedToken) as e:
-                logger.warning("Could not parse locals from %s: %s", tf_file, e)
+        Each file is parsed once and both kinds of block are read from the result.
+        Larger directories load their files on a thread pool; that overlaps file
+        and cache I/O, while Lark parsing itself still mostly holds the GIL.
+        Results are consumed in file order so later files keep overriding
+        earlier ones deterministically.
+        """
+        if len(tf_files) < self.PARALLEL_LOAD_MIN_FILES:
+            self._apply_tf_files(tf_files, map(_try_load_hcl, tf_files), refs)
+            return
+
+        workers = min(self.MAX_LOAD_WORKERS, len(tf_files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            self._apply_tf_files(tf_files, executor.map(_try_load_hcl, tf_files), refs)
+
+    def _apply_tf_files(
+        self,
+        tf_files: List[str],
+        loaded: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Exception]]],
+        refs: Dict[str, Any],
+    ) -> None:
+        """Extract variable defaults and locals from loaded .tf files, in order."""
+        for tf_file, (content, error) in zip(tf_files, loaded):
+            if isinstance(error, OSError):
+                logger.warning("Could not read file %s: %s", tf_file, error)
+                continue
+            if error is not None or content is None:
+                logger.warning("Could not parse variables and locals from %s: %s", tf_file, error)
+                continue
+
+            self._extract_variable_defaults(content, refs)
+            self._extract_locals(content, refs)
 
-    def _parse_variable_defaults(self) -> None:
-        """Parse variable blocks for default values from all .tf files."""
-        for tf_file in self.directory.glob("*.tf"):
-            try:
-                with open(tf_file, "r", encoding="utf-8") as f:
-                    content = hcl2.load(f)
-
-                for variable_block in content.get("variable", []):
-                    if isinstance(variable_block, dict):
-                        for var_name, var_config in variable_block.items():
-                            if isinstance(var_config, dict):
-                                default = var_config.get("default")
-                                if default is not None:
-                                    self._variables[var_name] = default
-                            elif isinstance(var_config, list) and var_config:
-                                # HCL2 sometimes returns list of configs
-                                config = var_config[0]
-                                if isinstance(config, dict):
-                                    default = config.get("default")
-                                    if default is not None:
-                                        self._variables[var_name] = default
-            except OSError as e:
-                logger.warning("Could not read file %s: %s", tf_file, e)
-            except (UnexpectedInput, UnexpectedToken) as e:
-                logger.warning("Could not parse variables from %s: %s", tf_file, e)
+    @staticmethod
+    def _extract_locals(content: Dict[str, Any], refs: Dict[str, Any]) -> None:
+        """Collect locals blocks from a parsed .tf file."""
+        for locals_block in content.get("locals", []):
+            if isinstance(locals_block, dict):
+                for key, value in locals_block.items():
+                    refs["local." + key] = value
+
+    @staticmethod
+    def _extract_variable_defaults(content: Dict[str, Any], refs: Dict[str, Any]) -> None:
+        """Collect variable default values from a parsed .tf file."""
+        for variable_block in content.get("variable", []):
+            if isinstance(variable_block, dict):
+                for var_name, var_config in variable_block.items():
+                    if isinstance(var_config, dict):
+                        default = var_config.get("default")
+                        if default is not None:
+                            refs["var." + var_name] = default
+                    elif isinstance(var_config, list) and var_config:
+                        # HCL2 sometimes returns list of configs
+                        config = var_config[0]
+                        if isinstance(config, dict):
+                            default = config.get("default")
+                            if default is not None:
+                                refs["var." + var_name] = default
 
     def get_variable(self, name: str) -> Optional[Any]:
         """Get a variable value by name.
@@ -111,7 +269,8 @@ class VariableResolver:
         Returns:
             The variable value, or None if not found
         """
-        return self._variables.get(name)
+        self._ensure_parsed()
+        return self._lookup_ref("var." + name)
 
     def get_local(self, name: str) -> Optional[Any]:
         """Get a local value by name.
@@ -122,7 +281,8 @@ class VariableResolver:
         Returns:
             The local value, or None if not found
         """
-        return self._locals.get(name)
+        self._ensure_parsed()
+        return self._lookup_ref("local." + name)
 
     def resolve(self, value: Any) -> Any:
         """Resolve interpolations in a value.
@@ -142,25 +302,47 @@ class VariableResolver:
         if not isinstance(value, str):
             return value
 
-        # Pattern to match ${var.name} or ${local.name}
-        pattern = r"\$\{(var|local)\.(\w+)\}"
+        # Most attribute strings have no interpolation at all
+        if "${" not in value:
+            return value
 
-        def replace_interpolation(match: re.Match) -> str:
-            ref_type = match.group(1)
-            ref_name = match.group(2)
+        cached = self._resolve_cache.get(value)
+        if cached is not None:
+            return cached
 
-            if ref_type == "var":
-                resolved = self.get_variable(ref_name)
-            else:  # local
-                resolved = self.get_local(ref_name)
+        self._ensure_parsed()
 
-            if resolved is not None:
-                return str(resolved)
-            else:
-                # Keep original if not resolvable
-                return match.group(0)
+        resolved = self._resolve_single(value)
+        if resolved is None:
+            resolved = _RE_INTERPOLATION.sub(self._replace_interpolation, value)
+        self._resolve_cache[value] = resolved
+        return resolved
 
-        return re.sub(pattern, replace_interpolation, value)
+    def _resolve_single(self, value: str) -> Optional[str]:
+        """Resolve a string holding exactly one interpolation without re.sub.
+
+        Covers the common "prefix-${var.x}-suffix" shape by slicing around the
+        reference. Returns None when the string has several interpolations (or
+        an unknown reference), leaving those to the regex path.
+        """
+        start = value.find("${")
+        end = value.find("}", start + 2)
+        if end == -1 or value.find("${", start + 2) != -1:
+            return None
+        ref = value[start + 2 : end]
+        resolved = self._lookup_ref(ref)
+        if resolved is None or not _RE_REFERENCE.fullmatch(ref):
+            return None
+        return value[:start] + str(resolved) + value[end + 1 :]
+
+    def _replace_interpolation(self, match: "re.Match[str]") -> str:
+        """Return the value for one ${var.x}/${local.x} match, or the match itself."""
+        resolved = self._lookup_ref(match.group(1))
+        if resolved is not None:
+            return str(resolved)
+        else:
+            # Keep original if not resolvable
+            return match.group(0)
 
     @staticmethod
     def truncate_name(name: str, max_length: int = 25) -> str:
@@ -173,8 +355,5 @@ class VariableResolver:
         Returns:
             The truncated name with '...' suffix if it exceeds max_length
         """
-        if len(name) <= max_length:
-            return name
-
         # Leave room for '...' suffix
-        return name[: max_length - 3] + "..."
+        return name if len(name) <= max_length else name[: max_length - 3] + "..."
@@ -5,14 +5,22 @@ from pathlib import Path
 import pytest
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def example_dir() -> Path:
     """Return path to example directory."""
     return Path(__file__).parent.parent / "example"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def simple_example(example_dir) -> Path:
     """Return path to example (used by integration tests)."""
     # Use vpc-demo which has complete terraform files
     return example_dir / "vpc-demo"
+
+
+@pytest.fixture(autouse=True)
+def hcl_cache_dir(tmp_path_factory, monkeypatch) -> Path:
+    """Keep cached hcl2 parse results out of the user's cache directory."""
+    cache_dir = tmp_path_factory.mktemp("hcl-cache")
+    monkeypatch.setenv("TERRAFORMGRAPH_CACHE_DIR", str(cache_dir))
+    return cache_dir
@@ -0,0 +1,92 @@
+"""Tests for the SVG/HTML renderers."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from terraformgraph.aggregator import AggregatedResult, LogicalConnection, LogicalService
+from terraformgraph.icons import IconMapper
+from terraformgraph.layout import LayoutEngine
+from terraformgraph.renderer import HTMLRenderer, SVGRenderer
+
+
+@pytest.fixture
+def aggregated() -> AggregatedResult:
+    """Return a small aggregated result with two connected services."""
+    services = [
+        LogicalService(service_type="s3", name="Buckets", icon_resource_type="aws_s3_bucket"),
+        LogicalService(service_type="sqs", name="Queues", icon_resource_type="aws_sqs_queue"),
+    ]
+    connections = [
+        LogicalConnection(source_id="s3.Buckets", target_id="sqs.Queues", connection_type="trigger")
+    ]
+    return AggregatedResult(services=services, connections=connections)
+
+
+def render_html(aggregated: AggregatedResult, **kwargs) -> str:
+    positions, groups, actual_height = LayoutEngine().compute_layout(aggregated)
+    html_renderer = HTMLRenderer(SVGRenderer(IconMapper()), **kwargs)
+    return html_renderer.render_html(aggregated, positions, groups, actual_height=actual_height)
+
+
+class TestCanvasConnections:
+    """Tests for the canvas connection rendering mode."""
+
+    def test_small_diagram_uses_svg_paths(self, aggregated):
+        """Test diagrams below the threshold do not embed the connection canvas."""
+        html = render_html(aggregated)
+
+        assert 'id="conn-canvas"' not in html
+        assert "const CANVAS_CONNECTIONS = false;" in html
+
+    def test_large_diagram_uses_canvas(self, aggregated):
+        """Test diagrams above the threshold embed the canvas and keep hit areas."""
+        html = render_html(aggregated, canvas_connection_threshold=0)
+
+        assert 'id="conn-canvas"' in html
+        assert 'class="canvas-connections"' in html
+        assert "const CANVAS_CONNECTIONS = true;" in html
+        assert 'class="connection-hitarea"' in html
+
+
+class TestIconSymbols:
+    """Tests for sharing icon markup through <symbol>/<use>."""
+
+    def test_repeated_icon_emitted_once(self):
+        """Test services with the same icon reference a single symbol."""
+        services = [
+            LogicalService(service_type="s3", name="Logs", icon_resource_type="aws_s3_bucket"),
+            LogicalService(service_type="s3", name="Assets", icon_resource_type="aws_s3_bucket"),
+        ]
+        aggregated = AggregatedResult(services=services)
+        positions, groups, actual_height = LayoutEngine().compute_layout(aggregated)
+
+        svg = SVGRenderer(IconMapper()).render_svg(
+            services, positions, [], groups, actual_height=actual_height
+        )
+
+        assert svg.count("<symbol ") == 1
+        assert svg.count('<use class="service-icon" href="#icon-0"') == 2
+
+
+class TestHTMLTemplate:
+    """Tests for HTML template substitution."""
+
+    def test_placeholders_filled(self, aggregated):
+        """Test every template placeholder is substituted."""
+        html = render_html(aggregated, export_quality=0.75)
+
+        assert "%%" not in html
+        assert "Environment: dev |" in html
+        assert "quality: 0.75" in html
+
+    def test_placeholder_text_in_svg_not_substituted(self, aggregated):
+        """Test substituted content is not rescanned for placeholders."""
+        aggregated.services[0].name = "%%ENVIRONMENT%%"
+
+        html = render_html(aggregated)
+
+        assert "%%ENVIRONMENT%%" in html
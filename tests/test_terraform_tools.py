@@ -1,12 +1,16 @@
 """Tests for terraform_tools module."""
 
 import json
+import sys
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from terraformgraph.terraform_tools import (
     TerraformStateResource,
     TerraformToolsRunner,
+    map_state_to_resource_id,
     parse_state_json,
 )
 
@@ -71,6 +75,24 @@ class TestTerraformStateResource:
         assert resource.full_id == "module.network.aws_vpc.main"
 
 
+class TestMapStateToResourceId:
+    """Tests for map_state_to_resource_id function."""
+
+    def test_plain_address(self):
+        """Test an address without index or module is unchanged."""
+        assert map_state_to_resource_id("aws_vpc.main") == "aws_vpc.main"
+
+    def test_strips_count_and_for_each_indexes(self):
+        """Test numeric and string indexes are removed."""
+        assert map_state_to_resource_id("aws_subnet.public[0]") == "aws_subnet.public"
+        assert map_state_to_resource_id('aws_subnet.public["a"]') == "aws_subnet.public"
+
+    def test_nested_indexed_modules(self):
+        """Test module prefixes are collapsed and module indexes removed."""
+        address = 'module.vpc[0].module.subnets["a"].aws_subnet.public[1]'
+        assert map_state_to_resource_id(address) == "vpc.subnets.aws_subnet.public"
+
+
 class TestTerraformToolsRunner:
     """Tests for TerraformToolsRunner class."""
 
@@ -86,6 +108,14 @@ class TestTerraformToolsRunner:
             runner = TerraformToolsRunner(Path("/tmp"))
             assert runner.check_terraform_available() is False
 
+    def test_check_terraform_available_cached(self):
+        """Test the PATH lookup runs once per runner."""
+        with patch("shutil.which", return_value="/usr/bin/terraform") as which:
+            runner = TerraformToolsRunner(Path("/tmp"))
+            assert runner.check_terraform_available() is True
+            assert runner.check_terraform_available() is True
+        assert which.call_count == 1
+
     def test_check_initialized_true(self, tmp_path):
         """Test terraform is initialized."""
         terraform_dir = tmp_path / ".terraform"
@@ -159,6 +189,24 @@ class TestParseStateJson:
         assert len(result.resources) == 1
         assert result.resources[0].resource_type == "aws_s3_bucket"
 
+    def test_parse_plan_json_prior_state_fallback(self):
+        """Test prior_state is used when planned_values has no root_module."""
+        json_data = {
+            "values": [],
+            "planned_values": {},
+            "prior_state": {
+                "values": {
+                    "root_module": {
+                        "resources": [
+                            {"address": "aws_vpc.main", "type": "aws_vpc", "name": "main"}
+                        ]
+                    }
+                }
+            },
+        }
+        result = parse_state_json(json_data)
+        assert [r.full_id for r in result.resources] == ["aws_vpc.main"]
+
     def test_parse_with_child_modules(self):
         """Test parsing JSON with child modules."""
         json_data = {
@@ -191,6 +239,27 @@ class TestParseStateJson:
         result = parse_state_json(json_data)
         assert len(result.resources) == 2
 
+    def test_parse_deeply_nested_child_modules(self):
+        """Test nested modules keep pre-order and do not hit the recursion limit."""
+        depth = sys.getrecursionlimit() + 100
+        root = {"resources": [], "child_modules": []}
+        module, address = root, ""
+        for i in range(depth):
+            address = f"{address}.module.m{i}" if address else f"module.m{i}"
+            queue = {"address": f"{address}.aws_sqs_queue.q", "type": "aws_sqs_queue", "name": "q"}
+            child = {"address": address, "resources": [queue], "child_modules": []}
+            module["child_modules"].append(child)
+            module = child
+        queue = {"address": "module.sibling.aws_sqs_queue.q", "type": "aws_sqs_queue", "name": "q"}
+        root["child_modules"].append({"address": "module.sibling", "resources": [queue]})
+
+        result = parse_state_json({"values": {"root_module": root}})
+
+        assert len(result.resources) == depth + 1
+        assert result.resources[0].module_path == "m0"
+        assert result.resources[1].module_path == "m0.m1"
+        assert result.resources[-1].module_path == "sibling"
+
     def test_parse_resource_with_index(self):
         """Test parsing resource with count index."""
         json_data = {
@@ -291,6 +360,26 @@ class TestTerraformToolsRunnerIntegration:
         assert len(result.resources) == 1
         assert result.resources[0].name == "main"
 
+    def test_run_show_json_skips_non_state_json(self, tmp_path):
+        """Test local JSON files without a root_module are skipped unparsed."""
+        (tmp_path / "plan.json").write_text(json.dumps({"unrelated": [1, 2, 3]}))
+        state_data = {
+            "values": {
+                "root_module": {
+                    "resources": [{"address": "aws_vpc.main", "type": "aws_vpc", "name": "main"}]
+                }
+            }
+        }
+        (tmp_path / "state.json").write_text(json.dumps(state_data))
+
+        runner = TerraformToolsRunner(tmp_path)
+        with patch("terraformgraph.terraform_tools._loads_json", wraps=json.loads) as loads:
+            result = runner.run_show_json()
+
+        assert loads.call_count == 1
+        assert result is not None
+        assert result.resources[0].name == "main"
+
     def test_run_show_json_file_not_found(self, tmp_path):
         """Test handling of missing state file."""
         runner = TerraformToolsRunner(tmp_path)
@@ -305,3 +394,42 @@ class TestTerraformToolsRunnerIntegration:
         runner = TerraformToolsRunner(tmp_path)
         result = runner.run_show_json(state_file=state_file)
         assert result is None
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shebang script")
+    def test_run_show_json_streams_terraform_output(self, tmp_path):
+        """Test state is read from a terraform show -json subprocess."""
+        state_data = {
+            "values": {
+                "root_module": {
+                    "resources": [{"address": "aws_vpc.main", "type": "aws_vpc", "name": "main"}]
+                }
+            }
+        }
+        fake_terraform = tmp_path / "terraform"
+        fake_terraform.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            "sys.stderr.write('warning: ' * 20000)\n"
+            f"sys.stdout.write({json.dumps(json.dumps(state_data))})\n"
+        )
+        fake_terraform.chmod(0o755)
+        (tmp_path / ".terraform").mkdir()
+
+        runner = TerraformToolsRunner(tmp_path, terraform_bin=str(fake_terraform))
+        runner.READ_CHUNK_SIZE = 16
+        result = runner.run_show_json()
+
+        assert result is not None
+        assert [r.name for r in result.resources] == ["main"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shebang script")
+    def test_run_show_json_timeout(self, tmp_path):
+        """Test a hanging terraform show is killed after the timeout."""
+        fake_terraform = tmp_path / "terraform"
+        fake_terraform.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+        fake_terraform.chmod(0o755)
+        (tmp_path / ".terraform").mkdir()
+
+        runner = TerraformToolsRunner(tmp_path, terraform_bin=str(fake_terraform))
+        runner.TIMEOUT_SHOW = 0.2
+        assert runner.run_show_json() is None
@@ -2,6 +2,9 @@
 
 import sys
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -105,6 +108,16 @@ locals {
         resolver = VariableResolver(tmp_path)
         assert resolver.get_variable("auto_var") == "auto-value"
 
+    def test_directory_named_like_tf_file_is_ignored(self, tmp_path, caplog):
+        """Test directories matching *.tf are skipped without warnings."""
+        (tmp_path / "modules.tf").mkdir()
+        (tmp_path / "terraform.tfvars").write_text('env = "prod"\n')
+
+        resolver = VariableResolver(tmp_path)
+
+        assert resolver.get_variable("env") == "prod"
+        assert "Could not read" not in caplog.text
+
 
 class TestInterpolationResolution:
     """Tests for resolve() method handling interpolations."""
@@ -164,6 +177,28 @@ locals {
         result = resolver.resolve("${var.env}-${local.region}")
         assert result == "prod-us-east-1"
 
+    def test_resolve_repeated_value_is_cached(self, tmp_path):
+        """Test resolving the same string twice reuses the first result."""
+        tfvars = tmp_path / "terraform.tfvars"
+        tfvars.write_text('env = "prod"\n')
+
+        resolver = VariableResolver(tmp_path)
+        first = resolver.resolve("app-${var.env}")
+        second = resolver.resolve("app-${var.env}")
+
+        assert first == "app-prod"
+        assert second is first
+
+    def test_resolve_single_interpolation_with_affixes(self, tmp_path):
+        """Test one interpolation is replaced in place and expressions are left alone."""
+        tfvars = tmp_path / "terraform.tfvars"
+        tfvars.write_text('env = "prod"\n')
+
+        resolver = VariableResolver(tmp_path)
+
+        assert resolver.resolve("app-${var.env}-bucket") == "app-prod-bucket"
+        assert resolver.resolve("${upper(var.env)}") == "${upper(var.env)}"
+
     def test_resolve_returns_original_if_unresolvable(self, tmp_path):
         """Test that unresolvable interpolations are kept as-is."""
         resolver = VariableResolver(tmp_path)
@@ -305,3 +340,99 @@ class TestParserIntegration:
 
         display_name = resource.get_resolved_display_name(resolver)
         assert display_name == "main_bucket"
+
+
+class TestLazyParsing:
+    """Tests for deferring file parsing until the resolver is queried."""
+
+    def test_files_parsed_on_first_lookup_only(self, tmp_path):
+        """Test construction and plain strings do not parse, and lookups parse once."""
+        (tmp_path / "terraform.tfvars").write_text('env = "prod"\n')
+
+        scan = VariableResolver._scan_directory
+        with patch.object(
+            VariableResolver, "_scan_directory", autospec=True, side_effect=scan
+        ) as m:
+            resolver = VariableResolver(tmp_path)
+            assert resolver.resolve("plain") == "plain"
+            assert m.call_count == 0
+
+            assert resolver.resolve("${var.env}") == "prod"
+            resolver.get_local("missing")
+            assert resolver.get_variable("env") == "prod"
+            assert m.call_count == 1
+
+    def test_failed_parse_is_retried(self, tmp_path):
+        """Test a parse that raised is not cached as an empty result."""
+        (tmp_path / "terraform.tfvars").write_text('env = "prod"\n')
+
+        scan = VariableResolver._scan_directory
+        with patch.object(
+            VariableResolver,
+            "_scan_directory",
+            autospec=True,
+            side_effect=[RuntimeError("boom"), scan(VariableResolver(tmp_path))],
+        ):
+            resolver = VariableResolver(tmp_path)
+            with pytest.raises(RuntimeError):
+                resolver.get_variable("env")
+            assert resolver.get_variable("env") == "prod"
+
+
+class TestParallelLoading:
+    """Tests for loading many .tf files on a thread pool."""
+
+    def test_many_files_with_parse_error(self, tmp_path):
+        """Test every valid file contributes and a broken one is skipped."""
+        count = VariableResolver.PARALLEL_LOAD_MIN_FILES + 2
+        for i in range(count):
+            (tmp_path / f"f{i}.tf").write_text(f'locals {{\n  name_{i} = "v{i}"\n}}\n')
+        (tmp_path / "broken.tf").write_text("locals {\n")
+
+        resolver = VariableResolver(tmp_path)
+
+        for i in range(count):
+            assert resolver.get_local(f"name_{i}") == f"v{i}"
+
+    def test_later_file_overrides_earlier(self, tmp_path):
+        """Test files are applied in name order regardless of load order."""
+        for i in range(VariableResolver.PARALLEL_LOAD_MIN_FILES + 2):
+            (tmp_path / f"f{i}.tf").write_text(f'locals {{\n  name = "v{i}"\n}}\n')
+
+        resolver = VariableResolver(tmp_path)
+
+        assert resolver.get_local("name") == f"v{VariableResolver.PARALLEL_LOAD_MIN_FILES + 1}"
+
+
+class TestParseCache:
+    """Tests for the on-disk cache of hcl2 parse results."""
+
+    def test_unchanged_file_is_not_reparsed(self, tmp_path, hcl_cache_dir):
+        """Test a second resolver reuses the cached parse result."""
+        (tmp_path / "terraform.tfvars").write_text('env = "prod"\n')
+        VariableResolver(tmp_path).get_variable("env")
+        assert list(hcl_cache_dir.iterdir())
+
+        with patch("hcl2.loads", side_effect=AssertionError("cache miss")):
+            assert VariableResolver(tmp_path).get_variable("env") == "prod"
+
+    def test_modified_file_is_reparsed(self, tmp_path):
+        """Test changing a file invalidates its cached result."""
+        tfvars = tmp_path / "terraform.tfvars"
+        tfvars.write_text('env = "prod"\n')
+        VariableResolver(tmp_path).get_variable("env")
+
+        tfvars.write_text('env = "staging"\n')
+        resolver = VariableResolver(tmp_path)
+
+        assert resolver.get_variable("env") == "staging"
+
+    def test_cache_can_be_disabled(self, tmp_path, hcl_cache_dir, monkeypatch):
+        """Test an empty cache directory setting turns caching off."""
+        monkeypatch.setenv("TERRAFORMGRAPH_CACHE_DIR", "")
+        (tmp_path / "terraform.tfvars").write_text('env = "prod"\n')
+
+        resolver = VariableResolver(tmp_path)
+
+        assert resolver.get_variable("env") == "prod"
+        assert not list(hcl_cache_dir.iterdir())
@@ -1,12 +1,23 @@
 """Tests for VPC Structure data models and VPCStructureBuilder."""
 
+import re
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
-from terraformgraph.parser import TerraformResource
+from terraformgraph.aggregator import (
+    AggregatedResult,
+    AvailabilityZone,
+    ResourceAggregator,
+    Subnet,
+    VPCEndpoint,
+    VPCStructure,
+    VPCStructureBuilder,
+)
+from terraformgraph.parser import ParseResult, TerraformResource
+from terraformgraph.variable_resolver import VariableResolver
 
 
 class TestSubnetDataclass:
@@ -14,8 +25,6 @@ class TestSubnetDataclass:
 
     def test_subnet_creation_with_required_fields(self):
         """Test creating Subnet with required fields."""
-        from terraformgraph.aggregator import Subnet
-
         subnet = Subnet(
             resource_id="aws_subnet.public_a",
             name="public-a",
@@ -31,8 +40,6 @@ class TestSubnetDataclass:
 
     def test_subnet_creation_with_cidr_block(self):
         """Test creating Subnet with optional cidr_block."""
-        from terraformgraph.aggregator import Subnet
-
         subnet = Subnet(
             resource_id="aws_subnet.private_a",
             name="private-a",
@@ -49,8 +56,6 @@ class TestAvailabilityZoneDataclass:
 
     def test_availability_zone_creation(self):
         """Test creating AvailabilityZone with required fields."""
-        from terraformgraph.aggregator import AvailabilityZone, Subnet
-
         subnet = Subnet(
             resource_id="aws_subnet.public_a",
             name="public-a",
@@ -71,8 +76,6 @@ class TestAvailabilityZoneDataclass:
 
     def test_availability_zone_empty_subnets(self):
         """Test creating AvailabilityZone with empty subnets list."""
-        from terraformgraph.aggregator import AvailabilityZone
-
         az = AvailabilityZone(
             name="us-east-1b",
             short_name="1b",
@@ -87,8 +90,6 @@ class TestVPCEndpointDataclass:
 
     def test_vpc_endpoint_creation(self):
         """Test creating VPCEndpoint with required fields."""
-        from terraformgraph.aggregator import VPCEndpoint
-
         endpoint = VPCEndpoint(
             resource_id="aws_vpc_endpoint.s3",
             name="s3-endpoint",
@@ -107,13 +108,6 @@ class TestVPCStructureDataclass:
 
     def test_vpc_structure_creation(self):
         """Test creating VPCStructure with required fields."""
-        from terraformgraph.aggregator import (
-            AvailabilityZone,
-            Subnet,
-            VPCEndpoint,
-            VPCStructure,
-        )
-
         subnet = Subnet(
             resource_id="aws_subnet.public_a",
             name="public-a",
@@ -142,8 +136,6 @@ class TestVPCStructureDataclass:
 
     def test_vpc_structure_empty_lists(self):
         """Test creating VPCStructure with empty lists."""
-        from terraformgraph.aggregator import VPCStructure
-
         vpc = VPCStructure(
             vpc_id="aws_vpc.empty",
             name="empty-vpc",
@@ -160,8 +152,6 @@ class TestVPCStructureBuilderAZDetection:
 
     def test_detect_az_from_availability_zone_attribute(self):
         """Test detecting AZ from availability_zone attribute."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -176,8 +166,6 @@ class TestVPCStructureBuilderAZDetection:
 
     def test_detect_az_from_name_suffix_a(self):
         """Test detecting AZ from name ending with -a."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -193,8 +181,6 @@ class TestVPCStructureBuilderAZDetection:
 
     def test_detect_az_from_name_suffix_1a(self):
         """Test detecting AZ from name ending with -1a."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -210,8 +196,6 @@ class TestVPCStructureBuilderAZDetection:
 
     def test_detect_az_from_name_suffix_az1(self):
         """Test detecting AZ from name containing -az1."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -226,8 +210,6 @@ class TestVPCStructureBuilderAZDetection:
 
     def test_detect_az_returns_none_for_unknown(self):
         """Test that unknown AZ patterns return None."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -246,8 +228,6 @@ class TestVPCStructureBuilderSubnetTypeDetection:
 
     def test_detect_public_subnet_from_name(self):
         """Test detecting public subnet type from name."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -262,8 +242,6 @@ class TestVPCStructureBuilderSubnetTypeDetection:
 
     def test_detect_private_subnet_from_name(self):
         """Test detecting private subnet type from name."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -278,8 +256,6 @@ class TestVPCStructureBuilderSubnetTypeDetection:
 
     def test_detect_database_subnet_from_name(self):
         """Test detecting database subnet type from name."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -294,8 +270,6 @@ class TestVPCStructureBuilderSubnetTypeDetection:
 
     def test_detect_db_subnet_from_name(self):
         """Test detecting database subnet type from 'db' in name."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -310,8 +284,6 @@ class TestVPCStructureBuilderSubnetTypeDetection:
 
     def test_detect_subnet_type_from_tags(self):
         """Test detecting subnet type from tags."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -329,8 +301,6 @@ class TestVPCStructureBuilderSubnetTypeDetection:
 
     def test_detect_unknown_subnet_type(self):
         """Test that unknown subnet types default to 'unknown'."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_subnet",
@@ -349,8 +319,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_gateway_endpoint_type(self):
         """Test detecting gateway endpoint type."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -365,8 +333,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_interface_endpoint_type(self):
         """Test detecting interface endpoint type."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -381,8 +347,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_endpoint_type_default(self):
         """Test default endpoint type is interface when not specified."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -397,8 +361,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_endpoint_service_s3(self):
         """Test detecting S3 service from endpoint."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -413,8 +375,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_endpoint_service_dynamodb(self):
         """Test detecting DynamoDB service from endpoint."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -429,8 +389,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_endpoint_service_ecr_api(self):
         """Test detecting ECR API service from endpoint."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -445,8 +403,6 @@ class TestVPCStructureBuilderEndpointDetection:
 
     def test_detect_endpoint_service_unknown(self):
         """Test detecting unknown service from endpoint."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resource = TerraformResource(
             resource_type="aws_vpc_endpoint",
@@ -465,8 +421,6 @@ class TestVPCStructureBuilderBuild:
 
     def test_build_empty_resources(self):
         """Test building VPC structure from empty resources list."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         result = builder.build([])
 
@@ -474,8 +428,6 @@ class TestVPCStructureBuilderBuild:
 
     def test_build_no_vpc(self):
         """Test building VPC structure when no VPC resource exists."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resources = [
             TerraformResource(
@@ -492,8 +444,6 @@ class TestVPCStructureBuilderBuild:
 
     def test_build_vpc_with_subnets(self):
         """Test building VPC structure with subnets."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resources = [
             TerraformResource(
@@ -539,8 +489,6 @@ class TestVPCStructureBuilderBuild:
 
     def test_build_vpc_with_endpoints(self):
         """Test building VPC structure with endpoints."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resources = [
             TerraformResource(
@@ -571,8 +519,6 @@ class TestVPCStructureBuilderBuild:
 
     def test_build_vpc_multiple_subnets_same_az(self):
         """Test building VPC with multiple subnets in same AZ."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         builder = VPCStructureBuilder()
         resources = [
             TerraformResource(
@@ -613,9 +559,6 @@ class TestVPCStructureBuilderBuild:
 
     def test_build_with_resolver(self, tmp_path):
         """Test building VPC structure with variable resolver."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-        from terraformgraph.variable_resolver import VariableResolver
-
         tfvars = tmp_path / "terraform.tfvars"
         tfvars.write_text('vpc_name = "resolved-vpc"\n')
         resolver = VariableResolver(tmp_path)
@@ -642,16 +585,12 @@ class TestAggregatedResultVPCStructure:
 
     def test_aggregated_result_has_vpc_structure_field(self):
         """Test that AggregatedResult has vpc_structure field."""
-        from terraformgraph.aggregator import AggregatedResult
-
         result = AggregatedResult()
         assert hasattr(result, "vpc_structure")
         assert result.vpc_structure is None
 
     def test_aggregated_result_with_vpc_structure(self):
         """Test creating AggregatedResult with VPCStructure."""
-        from terraformgraph.aggregator import AggregatedResult, VPCStructure
-
         vpc = VPCStructure(
             vpc_id="aws_vpc.main",
             name="main-vpc",
@@ -669,9 +608,6 @@ class TestResourceAggregatorWithTerraformDir:
 
     def test_aggregate_without_terraform_dir(self):
         """Test that aggregate works without terraform_dir."""
-        from terraformgraph.aggregator import ResourceAggregator
-        from terraformgraph.parser import ParseResult, TerraformResource
-
         aggregator = ResourceAggregator()
         parse_result = ParseResult(
             resources=[
@@ -689,12 +625,10 @@ class TestResourceAggregatorWithTerraformDir:
 
         # Should work without vpc_structure when no terraform_dir
         assert result is not None
+        assert result.total_resources == sum(len(s.resources) for s in result.services)
 
     def test_aggregate_with_terraform_dir(self, tmp_path):
         """Test that aggregate builds VPC structure when terraform_dir provided."""
-        from terraformgraph.aggregator import ResourceAggregator
-        from terraformgraph.parser import ParseResult, TerraformResource
-
         # Create a simple tfvars file
         tfvars = tmp_path / "terraform.tfvars"
         tfvars.write_text('vpc_name = "resolved-vpc"\n')
@@ -734,18 +668,54 @@ class TestVPCStructureBuilderPatterns:
 
     def test_az_patterns_exist(self):
         """Test that AZ_PATTERNS constant exists."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         assert hasattr(VPCStructureBuilder, "AZ_PATTERNS")
         assert isinstance(VPCStructureBuilder.AZ_PATTERNS, list)
         assert len(VPCStructureBuilder.AZ_PATTERNS) > 0
 
     def test_subnet_type_patterns_exist(self):
         """Test that SUBNET_TYPE_PATTERNS constant exists."""
-        from terraformgraph.aggregator import VPCStructureBuilder
-
         assert hasattr(VPCStructureBuilder, "SUBNET_TYPE_PATTERNS")
         assert isinstance(VPCStructureBuilder.SUBNET_TYPE_PATTERNS, dict)
         assert "public" in VPCStructureBuilder.SUBNET_TYPE_PATTERNS
         assert "private" in VPCStructureBuilder.SUBNET_TYPE_PATTERNS
         assert "database" in VPCStructureBuilder.SUBNET_TYPE_PATTERNS
+
+    def test_az_patterns_override_in_subclass(self):
+        """Test a subclass overriding AZ_PATTERNS changes AZ detection."""
+
+        class ZoneBuilder(VPCStructureBuilder):
+            AZ_PATTERNS = [re.compile(r"zone(\d)$")]
+
+        resource = TerraformResource(
+            resource_type="aws_subnet",
+            resource_name="public_zone2",
+            module_path="",
+            attributes={"name": "prod-public-a"},
+            source_file="main.tf",
+        )
+
+        assert VPCStructureBuilder()._detect_availability_zone(resource) == "detected-a"
+        assert ZoneBuilder()._detect_availability_zone(resource) is None
+
+        resource.attributes["name"] = "prod-zone2"
+        assert ZoneBuilder()._detect_availability_zone(resource) == "detected-2"
+
+    def test_subnet_type_patterns_override_in_subclass(self):
+        """Test a subclass overriding SUBNET_TYPE_PATTERNS changes type detection."""
+
+        class EdgeBuilder(VPCStructureBuilder):
+            SUBNET_TYPE_PATTERNS = {"public": ["edge"], "private": ["public"]}
+
+        resource = TerraformResource(
+            resource_type="aws_subnet",
+            resource_name="public_a",
+            module_path="",
+            attributes={"tags": {"Type": "edge"}},
+            source_file="main.tf",
+        )
+
+        assert VPCStructureBuilder()._detect_subnet_type(resource) == "public"
+        assert EdgeBuilder()._detect_subnet_type(resource) == "public"
+
+        resource.attributes["tags"] = {}
+        assert EdgeBuilder()._detect_subnet_type(resource) == "private"